@@ -0,0 +1,41 @@
+"""Import time of `modules` and check that importing it stays lazy.
+
+Every run imports the package in a fresh interpreter. Importing must not
+create catalog classes or load graphviz and the simulator, the script exits
+with an error otherwise.
+
+Usage: python -m benchmarks.imports [--repeat 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import modules
+seconds = time.perf_counter() - start
+from modules.barotrauma import catalog
+print(json.dumps({"seconds": seconds, "catalog": sorted(catalog._classes),
+                  "loaded": [m for m in ("graphviz", "modules.barotrauma.simulator") if m in sys.modules]}))
+"""
+
+def probe() -> dict:
+    result = subprocess.run([sys.executable, "-c", _PROBE], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.repeat)]
+    print(f"import modules: {min(r['seconds'] for r in runs) * 1000:.1f} ms (best of {args.repeat})")
+    eager = runs[0]["catalog"] + runs[0]["loaded"]
+    if eager:
+        sys.exit(f"created or loaded on import: {', '.join(eager)}")
+    print("catalog, graphviz and simulator are not loaded on import")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""`LookupTable` against the same ROM built from separate component modules.
+
+Usage: python -m benchmarks.lookup [--entries 1000 10000 50000] [--naive-limit 20000]
+"""
+import argparse
+import time
+import numpy as np
+from modules import SchemeModule, SignalIn, SignalOut, IdAllocator, LookupTable, Memory, SignalCheck
+from modules.barotrauma.submarine import SubmarineMainTag
+
+def table(values: np.ndarray) -> SchemeModule:
+    class Table(SchemeModule):
+        address = SignalIn()
+        value = SignalOut()
+
+        def __init__(self) -> None:
+            self.table = LookupTable(values)
+            self.connect(self.address, self.table.address)
+            self.connect(self.value, self.table.value)
+
+    return Table()
+
+def naive(values: np.ndarray) -> SchemeModule:
+    """Items of `LookupTable` without its relay trees, one module per item."""
+    class Naive(SchemeModule):
+        address = SignalIn()
+        value = SignalOut()
+
+        def __init__(self) -> None:
+            address = Memory(Value="", Writable=True)
+            output = Memory(Value="", Writable=True)
+            self.connect(self.address, address.signal_in)
+            self.connect(self.value, output.signal_out)
+            for key, value in enumerate(values.tolist()):
+                check = SignalCheck(TargetSignal=key, Output=value, FalseOutput="")
+                memory = Memory(Value=value, Writable=False)
+                self.connect(address.signal_out, check.signal_in)
+                self.connect(memory.signal_out, check.set_output)
+                self.connect(check.signal_out, output.signal_in)
+
+    return Naive()
+
+def measure(build, values: np.ndarray) -> tuple[float, float, float, int]:
+    start = time.perf_counter()
+    with IdAllocator():
+        module = build(values)
+    elaborate = time.perf_counter() - start
+    start = time.perf_counter()
+    tags = module.compile()
+    compile = time.perf_counter() - start
+    start = time.perf_counter()
+    SubmarineMainTag("lookup")(*tags).render()
+    render = time.perf_counter() - start
+    return elaborate, compile, render, len(tags)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--naive-limit", type=int, default=20000, help="Largest table built module by module.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'entries':>8} {'build':>6} {'items':>8} {'elab, s':>8} {'compile, s':>10} {'render, s':>9} {'total, s':>9}")
+    for entries in args.entries:
+        values = rng.integers(0, 1000, entries)
+        builds = [("table", table)] + ([("naive", naive)] if entries <= args.naive_limit else [])
+        for name, build in builds:
+            elaborate, compile, render, items = measure(build, values)
+            print(f"{entries:>8} {name:>6} {items:>8} {elaborate:>8.3f} {compile:>10.3f} {render:>9.3f} "
+                  f"{elaborate + compile + render:>9.3f}")
+
+if __name__ == "__main__":
+    main()
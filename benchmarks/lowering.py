@@ -0,0 +1,68 @@
+"""Parse-tree lowering with `Transformer`, with and without memoization.
+
+A program is a right-nested list of statements, as the grammar `program ::=
+(stmt program) | ""` parses it, each statement is a constant out of `--distinct`
+values lowered to its own scheme class. The time per node should not grow
+with the program size.
+
+Usage: python -m benchmarks.lowering [--sizes 10000 100000 1000000] [--distinct 100]
+"""
+import argparse
+import time
+from compiler.core import Token, TokenTree, Transformer
+from modules import SchemeModule, SignalOut, Addition
+
+def program(n: int, distinct: int) -> TokenTree:
+    root = TokenTree(Token("program"))
+    node = root
+    for i in range(n):
+        node.add_child(Token("stmt"))
+        node[-1].add_child(Token("const"))
+        node[-1][0].value = str(i % distinct)
+        node.add_child(Token("program"))
+        node = node[-1]
+    return root
+
+class Lower(Transformer):
+    def __init__(self, memoize: bool) -> None:
+        super().__init__()
+        self.memoize = memoize
+        self.calls = 0
+
+    def visit_const(self, tree: TokenTree, children: list) -> type[SchemeModule]:
+        self.calls += 1
+        value = int(tree.value)
+
+        class Constant(SchemeModule):
+            out = SignalOut()
+
+            def __init__(self) -> None:
+                adder = Addition(min=value, max=value)
+                self.connect(self.out, adder.signal_out)
+
+        return Constant
+
+    def visit_program(self, tree: TokenTree, children: list) -> int:
+        """Number of statements."""
+        return 0 if len(children) == 0 else 1 + children[1]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--distinct", type=int, default=100, help="Number of different constants.")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>9} {'memoize':>7} {'handler calls':>13} {'seconds':>8} {'us/node':>8}")
+    for size in args.sizes:
+        tree = program(size, args.distinct)
+        nodes = 3 * size + 1
+        for memoize in (False, True):
+            lower = Lower(memoize)
+            start = time.perf_counter()
+            statements = lower.transform(tree)
+            seconds = time.perf_counter() - start
+            assert statements == size
+            print(f"{nodes:>9} {str(memoize):>7} {lower.calls:>13} {seconds:>8.3f} {seconds / nodes * 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    main()
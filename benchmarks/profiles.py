@@ -0,0 +1,35 @@
+"""File size and save time of each `SaveProfile`.
+
+Usage: python -m benchmarks.profiles [--components 20000] [--repeat 3]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from modules import SubmarineBuilder, IdAllocator, PROFILES
+from .save import chain
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--components", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with IdAllocator():
+        builder = SubmarineBuilder("profiles", [chain(args.components, 1000)])
+    print(f"{'profile':>8} {'size, KiB':>10} {'ratio':>6} {'save, s':>8}")
+    baseline = None
+    for name, profile in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            builder.save(tmp, force=True, profile=profile)
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                builder.save(tmp, force=True, profile=profile)
+                best = min(best, time.perf_counter() - start)
+            size = (Path(tmp) / "profiles" / "profiles.sub").stat().st_size
+        baseline = baseline or size
+        print(f"{name:>8} {size / 1024:>10.1f} {size / baseline:>6.2f} {best:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Throughput of sequential `SubmarineBuilder.save` against `save_many`.
+
+`save_many` overlaps only gzip compression and writing with the next
+submarine's compilation, a speedup needs several CPUs and more than one variant.
+
+Usage: python -m benchmarks.save [--components 2000] [--variants 1 4 16] [--profile default]
+"""
+import argparse
+import tempfile
+import time
+from modules import SchemeModule, SignalIn, SignalOut, SubmarineBuilder, IdAllocator, save_many, PROFILES
+from modules.barotrauma.components import Addition, Greater
+
+def chain(n: int, clamp: int) -> SchemeModule:
+    class Chain(SchemeModule):
+        x = SignalIn()
+        y = SignalOut()
+
+        def __init__(self) -> None:
+            components = [(Addition if i % 2 == 0 else Greater)() for i in range(n)]
+            if isinstance(components[0], Addition):
+                components[0] = Addition(max=clamp)
+            self.connect(self.x, components[0].signal_in1)
+            for a, b in zip(components, components[1:]):
+                self.connect(a.signal_out, b.signal_in1)
+                self.connect(self.x, b.signal_in2)
+            self.connect(self.y, components[-1].signal_out)
+
+    return Chain()
+
+def variants(count: int, components: int) -> list[SubmarineBuilder]:
+    builders: list[SubmarineBuilder] = []
+    for i in range(count):
+        with IdAllocator():
+            builders.append(SubmarineBuilder(f"variant{i}", [chain(components, 1000 + i)]))
+    return builders
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--components", type=int, default=2000)
+    parser.add_argument("--variants", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--profile", choices=list(PROFILES), default="default")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'variants':>8} {'sequential, s':>14} {'save_many, s':>13} {'subs/s':>8} {'speedup':>8}")
+    for count in args.variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            builders = variants(count, args.components)
+            start = time.perf_counter()
+            for builder in builders:
+                builder.save(tmp, force=True, profile=args.profile)
+            sequential = time.perf_counter() - start
+            start = time.perf_counter()
+            save_many(builders, tmp, force=True, profile=args.profile, workers=args.workers)
+            parallel = time.perf_counter() - start
+        print(f"{count:>8} {sequential:>14.3f} {parallel:>13.3f} {count / parallel:>8.2f} {sequential / parallel:>8.2f}")
+
+if __name__ == "__main__":
+    main()
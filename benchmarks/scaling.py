@@ -0,0 +1,169 @@
+"""Scaling of elaboration, compilation and serialization with design size.
+
+Every case runs in its own subprocess, so peak RSS is measured per case.
+Results are printed as a table and written as JSON, `exponent` is the
+log-log slope of the total time against the previous size of the same
+design (1.0 is linear scaling).
+
+Usage: python -m benchmarks.scaling [--designs flat deep levels fanout] [--sizes 1000 10000 100000] [--output scaling.json]
+"""
+import argparse
+import json
+import math
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable
+from modules import Module, SchemeModule, SignalIn, SignalOut, IdAllocator, PROFILES, create_scheme
+from modules.barotrauma.components import Addition, Greater
+from modules.barotrauma.submarine import SubmarineMainTag
+
+def flat(n: int) -> Module:
+    """`n` components in one scheme, each reading the outputs of the two previous ones."""
+    class Flat(SchemeModule):
+        x = SignalIn()
+        y = SignalIn()
+        z = SignalOut()
+
+        def __init__(self) -> None:
+            components = [(Addition if i % 2 == 0 else Greater)() for i in range(n)]
+            sources = [self.x, self.y] + [c.signal_out for c in components]
+            for i, component in enumerate(components):
+                self.connect(sources[i], component.signal_in1)
+                self.connect(sources[i + 1], component.signal_in2)
+            self.connect(self.z, components[-1].signal_out)
+
+    return Flat()
+
+def deep(n: int) -> Module:
+    """Binary `create_scheme` hierarchy with `n` components (rounded down to a power of two).
+
+    Every scheme node is its own `create_scheme` class, as generated code builds them.
+    """
+    def level(depth: int) -> Module:
+        if depth == 0:
+            submodules = [Addition(), Greater()]
+        else:
+            submodules = [level(depth - 1), level(depth - 1)]
+        return create_scheme(2, 1, submodules, [((0, 0), (1, 0))],
+                             [[(0, 0)], [(0, 1), (1, 1)]], [[(1, 0)]])()
+
+    return level(max(0, int(math.log2(n)) - 1))
+
+def levels(n: int) -> Module:
+    """Same hierarchy as `deep` with one scheme class per level, instantiated twice by the level above.
+
+    Against `deep` it separates scheme resolution from class creation.
+    """
+    def level(child: Callable[[], tuple[Module, Module]]) -> type[SchemeModule]:
+        class Level(SchemeModule):
+            in1 = SignalIn()
+            in2 = SignalIn()
+            out1 = SignalOut()
+
+            def __init__(self) -> None:
+                first, second = child()
+                self.connect(first.outputs[0], second.inputs[0])
+                self.connect(self.in1, first.inputs[0])
+                self.connect(self.in2, first.inputs[1])
+                self.connect(self.in2, second.inputs[1])
+                self.connect(self.out1, second.outputs[0])
+
+        return Level
+
+    scheme = level(lambda: (Addition(), Greater()))
+    for _ in range(max(0, int(math.log2(n)) - 1)):
+        scheme = level(lambda scheme=scheme: (scheme(), scheme()))
+    return scheme()
+
+def fanout(n: int) -> Module:
+    """One input and one component output each driving `n` components."""
+    class Fanout(SchemeModule):
+        x = SignalIn()
+        y = SignalOut()
+
+        def __init__(self) -> None:
+            driver = Addition()
+            self.connect(self.x, driver.signal_in1)
+            self.connect(self.x, driver.signal_in2)
+            components = [Greater() for _ in range(n - 1)]
+            self.connect_many([self.x] * len(components), [c.signal_in1 for c in components])
+            self.connect_many([driver.signal_out] * len(components), [c.signal_in2 for c in components])
+            self.connect(self.y, components[-1].signal_out)
+
+    return Fanout()
+
+DESIGNS: dict[str, Callable[[int], Module]] = {"flat": flat, "deep": deep, "levels": levels, "fanout": fanout}
+
+def measure(design: str, size: int) -> dict:
+    """Run one case in the current process."""
+    start = time.perf_counter()
+    with IdAllocator():
+        module = DESIGNS[design](size)
+    elaborate = time.perf_counter() - start
+    start = time.perf_counter()
+    tags = module.compile()
+    compile = time.perf_counter() - start
+    start = time.perf_counter()
+    data = SubmarineMainTag("benchmark")(*tags).render().encode()
+    serialize = time.perf_counter() - start
+    start = time.perf_counter()
+    compressed = PROFILES["default"].compress(data)
+    gzip = time.perf_counter() - start
+    return {"design": design, "size": size,
+            "components": sum(1 for t in tags if t["identifier"] != "redwire"),
+            "tags": len(tags), "elaborate": elaborate, "compile": compile,
+            "serialize": serialize, "gzip": gzip, "xml_bytes": len(data),
+            "gzip_bytes": len(compressed),
+            "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+def run(design: str, size: int, timeout: float | None) -> dict:
+    """Run one case in a fresh interpreter."""
+    command = [sys.executable, "-m", "benchmarks.scaling", "--case", design, str(size)]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout, check=True)
+    except subprocess.TimeoutExpired:
+        return {"design": design, "size": size, "error": "timeout"}
+    except subprocess.CalledProcessError as error:
+        return {"design": design, "size": size, "error": error.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--designs", nargs="+", choices=list(DESIGNS), default=list(DESIGNS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--output", default="scaling.json")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds per case.")
+    parser.add_argument("--case", nargs=2, metavar=("DESIGN", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case is not None:
+        print(json.dumps(measure(args.case[0], int(args.case[1]))))
+        return
+
+    print(f"{'design':>7} {'size':>7} {'tags':>8} {'elab, s':>8} {'compile, s':>10} {'render, s':>9} "
+          f"{'gzip, s':>8} {'gzip, KiB':>10} {'RSS, MiB':>9} {'exponent':>8}")
+    results: list[dict] = []
+    for design in args.designs:
+        previous = None
+        for size in sorted(args.sizes):
+            result = run(design, size, args.timeout)
+            results.append(result)
+            if "error" in result:
+                print(f"{design:>7} {size:>7} {result['error']}")
+                continue
+            total = result["elaborate"] + result["compile"] + result["serialize"] + result["gzip"]
+            exponent = None
+            if previous is not None and result["components"] != previous[0] and previous[1] > 0:
+                exponent = math.log(total / previous[1]) / math.log(result["components"] / previous[0])
+            result["exponent"] = exponent
+            previous = (result["components"], total)
+            print(f"{design:>7} {result['components']:>7} {result['tags']:>8} {result['elaborate']:>8.3f} "
+                  f"{result['compile']:>10.3f} {result['serialize']:>9.3f} {result['gzip']:>8.3f} "
+                  f"{result['gzip_bytes'] / 1024:>10.1f} {result['peak_rss'] / 2 ** 20:>9.1f} "
+                  f"{'-' if exponent is None else f'{exponent:.2f}':>8}")
+    with open(args.output, "w") as file:
+        json.dump({"python": sys.version, "results": results}, file, indent=4)
+
+if __name__ == "__main__":
+    main()
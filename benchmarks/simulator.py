@@ -0,0 +1,64 @@
+"""Throughput of `Simulator.step` on layered synthetic circuits.
+
+Usage: python -m benchmarks.simulator [--width 64] [--depth 16] [--batch 1 1024 16384]
+"""
+import argparse
+import time
+import numpy as np
+from modules import SchemeModule, SignalIn, SignalOut, Simulator
+from modules.barotrauma.components import Addition, Greater
+
+def layered_circuit(width: int, depth: int) -> SchemeModule:
+    """`depth` layers of `width` components, lane i of each layer reads lanes i and i+1 of the previous one."""
+    def add_ports(cls: type) -> type:
+        for i in range(width):
+            setattr(cls, f"in{i + 1}", SignalIn())
+            setattr(cls, f"out{i + 1}", SignalOut())
+        return cls
+
+    @add_ports
+    class Layered(SchemeModule):
+        def __init__(self) -> None:
+            previous = None
+            for layer in range(depth):
+                kind = Addition if layer % 2 == 0 else Greater
+                current = [kind() for _ in range(width)]
+                for i, component in enumerate(current):
+                    if previous is None:
+                        self.connect(self.inputs[i], component.signal_in1)
+                        self.connect(self.inputs[(i + 1) % width], component.signal_in2)
+                    else:
+                        self.connect(previous[i].signal_out, component.signal_in1)
+                        self.connect(previous[(i + 1) % width].signal_out, component.signal_in2)
+                previous = current
+            for i, component in enumerate(previous):
+                self.connect(self.outputs[i], component.signal_out)
+
+    return Layered()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=16)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 1024, 16384])
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    module = layered_circuit(args.width, args.depth)
+    simulator = Simulator(module)
+    setup = time.perf_counter() - start
+    print(f"components: {len(simulator.netlist)}, setup: {setup:.3f}s")
+    print(f"{'batch':>8} {'tick, ms':>10} {'ticks/s':>10} {'vectors*ticks/s':>16}")
+    rng = np.random.default_rng(0)
+    for batch in args.batch:
+        simulator.reset(batch)
+        simulator.set_inputs(rng.integers(-100, 100, size=(batch, args.width)))
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            simulator.step()
+        elapsed = (time.perf_counter() - start) / args.ticks
+        print(f"{batch:>8} {elapsed * 1e3:>10.3f} {1 / elapsed:>10.1f} {batch / elapsed:>16.3e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Item counts before and after `allocate_wires` on large designs.
+
+Besides the `benchmarks.scaling` designs, `shared` routes every signal into a
+scheme through two inputs ending at the same port, so half of its wires are
+redundant. Connections over `MAX_LINKS` wires (`fanout`) are split through
+relays, which adds items.
+
+Usage: python -m benchmarks.wiring [--designs flat deep levels fanout shared] [--sizes 1000 10000]
+"""
+import argparse
+import time
+from modules import Module, SchemeModule, SignalIn, SignalOut, IdAllocator, allocate_wires
+from modules.barotrauma.components import Addition
+from modules.barotrauma.submarine import SubmarineMainTag
+from .scaling import DESIGNS
+
+def shared(n: int) -> Module:
+    """Chain of `n` adders, each fed through two scheme inputs wired to the same port."""
+    class Pair(SchemeModule):
+        a = SignalIn()
+        b = SignalIn()
+        c = SignalIn()
+        out = SignalOut()
+
+        def __init__(self) -> None:
+            adder = Addition()
+            self.connect(self.a, adder.signal_in1)
+            self.connect(self.b, adder.signal_in1)
+            self.connect(self.c, adder.signal_in2)
+            self.connect(self.out, adder.signal_out)
+
+    class Shared(SchemeModule):
+        x = SignalIn()
+        y = SignalOut()
+
+        def __init__(self) -> None:
+            first = Addition()
+            self.connect(self.x, first.signal_in1)
+            self.connect(self.x, first.signal_in2)
+            previous = first.signal_out
+            for _ in range(n - 1):
+                pair = Pair()
+                self.connect(previous, pair.a)
+                self.connect(previous, pair.b)
+                self.connect(first.signal_out, pair.c)
+                previous = pair.out
+            self.connect(self.y, previous)
+
+    return Shared()
+
+def main() -> None:
+    designs = {**DESIGNS, "shared": shared}
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--designs", nargs="+", choices=list(designs), default=list(designs))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'design':>7} {'size':>6} {'items before':>12} {'items after':>11} {'change':>7} "
+          f"{'relays':>6} {'overflows':>9} {'xml, KiB':>15} {'pass, s':>7}")
+    for name in args.designs:
+        for size in args.sizes:
+            with IdAllocator():
+                module = designs[name](size)
+            before = len(SubmarineMainTag("benchmark")(*module.compile()).render(False))
+            start = time.perf_counter()
+            report = allocate_wires(module)
+            seconds = time.perf_counter() - start
+            after = len(SubmarineMainTag("benchmark")(*module.compile()).render(False))
+            print(f"{name:>7} {size:>6} {report.items_before:>12} {report.items_after:>11} "
+                  f"{0.0 - report.reduction:>+7.1%} {report.relays:>6} {len(report.overflows):>9} "
+                  f"{f'{before / 1024:.0f}->{after / 1024:.0f}':>15} {seconds:>7.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Build a source tree into a Barotrauma submarine.
+
+Usage: python -m compiler build SOURCE_DIR --frontend package.module:Frontend [--out DIR] [--name NAME] [--watch]
+"""
+import argparse
+import sys
+from importlib import import_module
+from pathlib import Path
+from .build import BuildDriver, BuildResult, Frontend
+from modules import PROFILES
+
+def load_frontend(spec: str) -> Frontend:
+    """Instance of the `Frontend` subclass given as "package.module:ClassName"."""
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Frontend must be given as 'package.module:ClassName' (got '{spec}').")
+    frontend = getattr(import_module(module_name), class_name)()
+    if not isinstance(frontend, Frontend):
+        raise ValueError(f"{spec} is not a `Frontend` subclass.")
+    return frontend
+
+def report(result: BuildResult | Exception) -> None:
+    if isinstance(result, Exception):
+        print(f"error: {result}", file=sys.stderr)
+    elif len(result.rebuilt) == 0 and not result.saved:
+        print(f"up to date ({result.seconds:.3f} s)")
+    else:
+        print(f"rebuilt {len(result.rebuilt)} file(s), {'saved' if result.saved else 'output unchanged'} "
+              f"({result.seconds:.3f} s)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m compiler", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build the submarine, optionally rebuilding on changes.")
+    build.add_argument("source", type=Path, help="Directory with the source files.")
+    build.add_argument("--frontend", required=True, help="Language frontend as 'package.module:ClassName'.")
+    build.add_argument("--out", type=Path, default=Path("build"), help="Directory of the content package.")
+    build.add_argument("--name", default=None, help="Submarine name, the source directory name by default.")
+    build.add_argument("--profile", choices=list(PROFILES), default="default", help="Save profile.")
+    build.add_argument("--force", action="store_true", help="Ignore all cached results.")
+    build.add_argument("--watch", action="store_true", help="Poll the sources and rebuild on changes.")
+    build.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds.")
+    args = parser.parse_args()
+
+    try:
+        frontend = load_frontend(args.frontend)
+    except (ImportError, AttributeError, ValueError) as error:
+        parser.error(str(error))
+    driver = BuildDriver(frontend, args.source, args.out, args.name or args.source.resolve().name, args.profile)
+    driver.changed()    # remember the current sources, watching starts after this build
+    try:
+        report(driver.build(force=args.force))
+    except ValueError as error:
+        report(error)
+        if not args.watch:
+            sys.exit(1)
+    if args.watch:
+        try:
+            driver.watch(args.interval, report)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable
+from .core import Grammar, TokenTree
+from modules import Module, IdAllocator, SubmarineBuilder, SaveProfile
+
+__all__ = ["Frontend", "BuildResult", "BuildDriver"]
+
+CACHE_VERSION: int = 1
+
+class Frontend(ABC):
+    """Language part of a build: grammar, dependencies and lowering of the source files.
+
+    `lower` receives the units of the file's dependencies, so it may refer to
+    schemes defined there. Units and modules are kept between builds of a
+    `BuildDriver` and recreated only for changed files and the files depending
+    on them, so the kept modules are not recompiled. Trees are usually walked
+    with a `Visitor` (dependencies) and a `Transformer` (lowering).
+    """
+    suffix: str = ".bs"     # extension of the source files
+    root: str = "program"   # grammar rule matching a whole file
+
+    @property
+    @abstractmethod
+    def grammar(self) -> Grammar:
+        pass
+
+    def parse(self, text: str) -> TokenTree:
+        return self.grammar.tokenize(self.root, text)
+
+    def dependencies(self, tree: TokenTree) -> list[str]:
+        """Paths of the files the source depends on, relative to its directory."""
+        return []
+
+    @abstractmethod
+    def lower(self, tree: TokenTree, path: Path, imports: dict[Path, Any]) -> Any:
+        """Unit of a parsed file (e.g. its scheme classes), `imports` maps dependency paths to units."""
+        pass
+
+    def modules(self, path: Path, unit: Any) -> list[Module]:
+        """Top-level modules a file places in the submarine, none by default."""
+        return []
+
+@dataclass(frozen=True)
+class BuildResult:
+    """Files parsed and lowered by a build, `saved` is False if the output was up to date."""
+    rebuilt: tuple[Path, ...]
+    saved: bool
+    seconds: float
+
+class BuildDriver:
+    """Incremental build of a source tree into a submarine.
+
+    The hash and dependencies of every file are kept in `<save_dir>/.<name>.sources.json`.
+    A build re-parses and re-lowers only files whose content changed since the
+    previous build of the driver and their dependents, unchanged modules are not
+    recompiled by `SubmarineBuilder.save` either. In a new process nothing is
+    built if no file changed since the cached build.
+
+    Args:
+        frontend: Language of the sources.
+        source_dir: Directory searched for `*<frontend.suffix>` files.
+        save_dir: Directory of the content package.
+        name: Submarine name.
+        profile: `SaveProfile` or name of one of `PROFILES`.
+    """
+    def __init__(self, frontend: Frontend, source_dir: Path | str, save_dir: Path | str,
+                 name: str, profile: SaveProfile | str = "default") -> None:
+        self._frontend = frontend
+        self._source_dir = Path(source_dir).resolve()
+        self._save_dir = Path(save_dir)
+        self._name = name
+        self._profile = profile
+        self._ids = IdAllocator()   # shared by all builds, so kept modules keep their IDs
+        self._hashes: dict[Path, str] = {}
+        self._dependencies: dict[Path, tuple[Path, ...]] = {}
+        self._units: dict[Path, Any] = {}
+        self._modules: dict[Path, list[Module]] = {}
+        self._stats: dict[Path, tuple[int, int]] = {}
+
+    @property
+    def cache_path(self) -> Path:
+        return self._save_dir / f".{self._name}.sources.json"
+
+    @property
+    def units(self) -> dict[Path, Any]:
+        return dict(self._units)
+
+    def _sources(self) -> list[Path]:
+        return sorted(self._source_dir.rglob(f"*{self._frontend.suffix}"))
+
+    def _key(self) -> str:
+        cls = self._frontend.__class__
+        return f"{cls.__module__}.{cls.__qualname__}:{self._profile!r}"
+
+    def _load_cache(self) -> dict[str, Any]:
+        if not self.cache_path.exists():
+            return {}
+        cache = json.loads(self.cache_path.read_text())
+        if cache.get("version") != CACHE_VERSION or cache.get("frontend") != self._key():
+            return {}
+        return cache
+
+    def _save_cache(self) -> None:
+        files = {str(path.relative_to(self._source_dir)): {
+            "hash": self._hashes[path],
+            "dependencies": [str(d.relative_to(self._source_dir)) for d in self._dependencies[path]]
+        } for path in self._hashes}
+        cache = {"version": CACHE_VERSION, "frontend": self._key(), "files": files}
+        self._save_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps(cache, indent=4))
+
+    def _order(self, paths: set[Path]) -> list[Path]:
+        """`paths` with dependencies first."""
+        order: list[Path] = []
+        state: dict[Path, bool] = {}    # False while visiting, True when done
+        for start in sorted(paths):
+            stack: list[tuple[Path, bool]] = [(start, False)]
+            while stack:
+                path, leaving = stack.pop()
+                if leaving:
+                    state[path] = True
+                    order.append(path)
+                    continue
+                if state.get(path) is True:
+                    continue
+                if state.get(path) is False:
+                    raise ValueError(f"Circular dependency through {path}.")
+                state[path] = False
+                stack.append((path, True))
+                stack.extend([(d, False) for d in reversed(self._dependencies[path]) if d in paths])
+        return order
+
+    def _dependents(self, paths: set[Path]) -> set[Path]:
+        """`paths` and all files depending on them."""
+        reverse: dict[Path, list[Path]] = {}
+        for path, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                reverse.setdefault(dependency, []).append(path)
+        found = set(paths)
+        stack = list(paths)
+        while stack:
+            for dependent in reverse.get(stack.pop(), []):
+                if dependent not in found:
+                    found.add(dependent)
+                    stack.append(dependent)
+        return found
+
+    def changed(self) -> bool:
+        """Whether any source file was added, removed or modified since the last check (by mtime)."""
+        stats = {path: (path.stat().st_mtime_ns, path.stat().st_size) for path in self._sources()}
+        changed = stats != self._stats
+        self._stats = stats
+        return changed
+
+    def build(self, force: bool = False) -> BuildResult:
+        """Bring the content package up to date with the sources.
+
+        Raises:
+            ValueError: On syntax errors, unknown or circular dependencies.
+        """
+        start = time.perf_counter()
+        texts = {path: path.read_text() for path in self._sources()}
+        hashes = {path: sha256(text.encode()).hexdigest() for path, text in texts.items()}
+        if len(self._units) == 0 and not force:
+            cache = self._load_cache()
+            cached = {self._source_dir / rel: entry["hash"] for rel, entry in cache.get("files", {}).items()}
+            if cached == hashes and (self._save_dir / self._name / f"{self._name}.sub").exists():
+                return BuildResult(tuple(), False, time.perf_counter() - start)
+        dirty = {path for path in hashes if force or self._hashes.get(path) != hashes[path]
+                 or path not in self._units}
+        removed = set(self._hashes) - set(hashes)
+        dirty = self._dependents(dirty | removed) & set(hashes)
+        for path in removed:
+            self._units.pop(path, None)
+            self._modules.pop(path, None)
+            self._dependencies.pop(path, None)
+        trees: dict[Path, TokenTree] = {}
+        for path in sorted(dirty):
+            try:
+                trees[path] = self._frontend.parse(texts[path])
+            except ValueError as error:
+                raise ValueError(f"{path}: {error}") from None
+            dependencies = []
+            for dependency in self._frontend.dependencies(trees[path]):
+                resolved = (path.parent / dependency).resolve()
+                if resolved not in hashes:
+                    raise ValueError(f"{path}: unknown dependency '{dependency}'.")
+                dependencies.append(resolved)
+            self._dependencies[path] = tuple(dependencies)
+        order = self._order(dirty)
+        for path in order:
+            imports = {d: self._units[d] for d in self._dependencies[path]}
+            with self._ids:
+                self._units[path] = self._frontend.lower(trees[path], path, imports)
+                self._modules[path] = self._frontend.modules(path, self._units[path])
+        self._hashes = hashes
+        modules = [module for path in sorted(self._modules) for module in self._modules[path]]
+        saved = SubmarineBuilder(self._name, modules).save(self._save_dir, force, self._profile)
+        self._save_cache()
+        return BuildResult(tuple(order), saved, time.perf_counter() - start)
+
+    def watch(self, interval: float = 0.5, report: Callable[[BuildResult | Exception], None] = print) -> None:
+        """Rebuild whenever the sources change, until interrupted.
+
+        Errors are reported and the previous output is kept until the sources are fixed.
+        """
+        while True:
+            if self.changed():
+                try:
+                    report(self.build())
+                except Exception as error:
+                    report(error)
+            time.sleep(interval)
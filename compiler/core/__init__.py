@@ -1,3 +1,4 @@
 from .grammar import *
 from .token import *
-from .tokenizer import *
\ No newline at end of file
+from .tokenizer import *
+from .visitor import *
\ No newline at end of file
@@ -2,7 +2,7 @@ from __future__ import annotations
 import re
 from re import Pattern
 from abc import ABC, abstractmethod
-from typing import Self, Generator, TYPE_CHECKING
+from typing import Self, Generator, Iterator, TYPE_CHECKING
 if TYPE_CHECKING: from .grammar import GrammarRule
 
 __all__ = ["TokenBase", "Token", "TokenString", "TokenExpr", "TokenOr", "TokenAnd", "TokenTree"]
@@ -117,10 +117,23 @@ class TokenTree:
     @property
     def childs(self) -> tuple[Self, ...]:
         return tuple(self._childs)
+
+    def __iter__(self) -> Iterator[Self]:
+        """Children without copying, see `childs`."""
+        return iter(self._childs)
+
+    def __len__(self) -> int:
+        return len(self._childs)
+
+    def __getitem__(self, index: int) -> Self:
+        return self._childs[index]
+
+    def __bool__(self) -> bool:
+        return True     # a leaf is still a tree, `__len__` would make it false
     
     def __repr__(self) -> str:
         childs: str = ""
-        for child in self.childs:
+        for child in self:
             if len(childs) == 0:
                 childs = "\n"
             child_str = str(child).removesuffix("\n").replace("\n", "\n\t")
@@ -0,0 +1,112 @@
+from typing import Any, Callable
+from .token import TokenTree
+
+__all__ = ["Visitor", "Transformer"]
+
+class _Dispatch:
+    """Handlers `visit_<rule name>` of the class, collected once per class."""
+    _table: dict[str, Callable] = {}
+
+    def __init_subclass__(cls) -> None:
+        cls._table = {name.removeprefix("visit_"): getattr(cls, name)
+                      for name in dir(cls) if name.startswith("visit_")}
+
+class Visitor(_Dispatch):
+    """Top-down walk over a parse tree, calling `visit_<rule name>(tree)` for every node.
+
+    Nodes are visited in pre-order without recursion; a handler returning
+    False skips the node's subtree. Rules without a handler go to `default`.
+
+        class Imports(Visitor):
+            def __init__(self) -> None:
+                self.paths: list[str] = []
+
+            def visit_import(self, tree: TokenTree) -> None:
+                self.paths.append(tree.value.split()[1])
+    """
+    def default(self, tree: TokenTree) -> bool | None:
+        pass
+
+    def visit(self, tree: TokenTree) -> None:
+        table = self._table
+        default = self.__class__.default
+        stack: list[TokenTree] = [tree]
+        while stack:
+            node = stack.pop()
+            if table.get(node.root.name, default)(self, node) is not False:
+                stack.extend(reversed(node._childs))
+
+class Transformer(_Dispatch):
+    """Bottom-up evaluation of a parse tree: `visit_<rule name>(tree, children)` gets
+    the results of the node's children and returns the node's result.
+
+    Nodes are processed in post-order without recursion. Equal subtrees (same
+    rule names and values) are numbered once, and with `memoize` their result
+    is computed once and shared, e.g. the scheme class of a repeated constant
+    expression. The numbering and results are kept between `transform` calls
+    until `clear`. Handlers must therefore depend only on the subtree, and
+    shared results should be immutable (scheme classes rather than modules).
+    Rules without a handler go to `default`.
+
+        class Lower(Transformer):
+            def visit_number(self, tree: TokenTree, children: list) -> int:
+                return int(tree.value)
+
+            def visit_sum(self, tree: TokenTree, children: list) -> int:
+                return sum(children)
+    """
+    memoize: bool = True
+
+    def __init__(self) -> None:
+        self._ids: dict[tuple, int] = {}     # (rule name, value, child ids) -> subtree id
+        self._results: dict[int, Any] = {}
+
+    @property
+    def n_subtrees(self) -> int:
+        """Number of distinct subtrees seen."""
+        return len(self._ids)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._results.clear()
+
+    def default(self, tree: TokenTree, children: list[Any]) -> Any:
+        """Leaf value, the result of a single child or the list of children results."""
+        if len(children) == 0:
+            return tree.value
+        if len(children) == 1:
+            return children[0]
+        return children
+
+    def transform(self, tree: TokenTree) -> Any:
+        table = self._table
+        default = self.__class__.default
+        ids = self._ids
+        results = self._results
+        stack: list[tuple[TokenTree, int]] = [(tree, 0)]
+        done_ids: list[int] = []        # ids and results of finished subtrees, children
+        done_results: list[Any] = []    # are taken from the top when the parent finishes
+        while stack:
+            node, i = stack.pop()
+            childs = node._childs
+            if i < len(childs):
+                stack.append((node, i + 1))
+                stack.append((childs[i], 0))
+                continue
+            start = len(done_ids) - len(childs)
+            name = node.root.name
+            key = (name, node.value, tuple(done_ids[start:]))
+            subtree = ids.get(key)
+            if subtree is None:
+                subtree = ids[key] = len(ids)
+            if self.memoize and subtree in results:
+                result = results[subtree]
+            else:
+                result = table.get(name, default)(self, node, done_results[start:])
+                if self.memoize:
+                    results[subtree] = result
+            del done_ids[start:]
+            del done_results[start:]
+            done_ids.append(subtree)
+            done_results.append(result)
+        return done_results[0]
@@ -1,3 +1,15 @@
 from .core import *
 from .barotrauma import *
-from .custom import *
\ No newline at end of file
+from .custom import *
+
+# `from modules import *` still binds the names exported before lazy loading, the star import creates them
+__all__ = [name for name in dir() if not name.startswith("_")] + [
+    "Addition", "Substract", "Multiply", "Divide", "Simulator", *TAGS
+]
+
+def __getattr__(name: str):
+    from . import barotrauma
+    try:
+        return getattr(barotrauma, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -1,3 +1,23 @@
 from .tags import *
 from .components import *
-from .submarine import *
\ No newline at end of file
+from .catalog import *
+from .loader import *
+from .lookup import *
+from .submarine import *
+from .netlist import *
+from .latency import *
+from .wiring import *
+
+# loaded on first access: catalog classes and modules with heavy dependencies
+_LAZY_MODULES: dict[str, str] = {"Simulator": "simulator"}
+
+def __getattr__(name: str):
+    from importlib import import_module
+    from . import catalog
+    if name in catalog.COMPONENTS:
+        return catalog.component_class(name)
+    if name in catalog.TAGS:
+        return catalog.tag_class(name)
+    if name in _LAZY_MODULES:
+        return getattr(import_module(f".{_LAZY_MODULES[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
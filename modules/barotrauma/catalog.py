@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Any
+from . import tags, components
+from .. import SignalIn, SignalOut
+
+__all__ = ["TagSpec", "ComponentSpec", "TAGS", "COMPONENTS", "tag_class", "component_class"]
+
+@dataclass(frozen=True)
+class TagSpec:
+    """Component element: its XML name, generalized base in `tags` and own default attributes."""
+    tag_name: str
+    base: str = "ComponentTag"
+    defaults: dict[str, Any] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class ComponentSpec:
+    """Logical item: identifier, component tag and base module in `components`.
+
+    `inputs` and `outputs` are needed only if the base module does not define its ports.
+    """
+    identifier: str
+    tag: str
+    base: str = "CatalogModule"
+    inputs: tuple[str, ...] = tuple()
+    outputs: tuple[str, ...] = tuple()
+
+TAGS: dict[str, TagSpec] = {
+    "AdderComponentTag": TagSpec("AdderComponent", "ArithmeticComponentTag"),
+    "SubstractComponentTag": TagSpec("SubstractComponent", "ArithmeticComponentTag"),
+    "MultiplyComponentTag": TagSpec("MultiplyComponent", "ArithmeticComponentTag"),
+    "DivideComponentTag": TagSpec("DivideComponent", "ArithmeticComponentTag"),
+    "GreaterComponentTag": TagSpec("GreaterComponent", "ConditionComponentTag"),
+    "EqualsComponentTag": TagSpec("EqualsComponent", "ConditionComponentTag"),
+    "AndComponentTag": TagSpec("AndComponent", "ConditionComponentTag"),
+    "OrComponentTag": TagSpec("OrComponent", "ConditionComponentTag"),
+    "XorComponentTag": TagSpec("XorComponent", "ConditionComponentTag"),
+    "SignalCheckComponentTag": TagSpec("SignalCheckComponent", "ConditionComponentTag", {"TargetSignal": ""}),
+    "MemoryComponentTag": TagSpec("MemoryComponent", defaults={"MaxValueLength": 200, "Value": None, "Writable": True}),
+    "RelayComponentTag": TagSpec("RelayComponent", defaults={"MaxPower": 1000, "IsOn": True})
+}
+
+COMPONENTS: dict[str, ComponentSpec] = {
+    "Addition": ComponentSpec("addercomponent", "AdderComponentTag", "ArithmeticModule"),
+    "Substract": ComponentSpec("subtractcomponent", "SubstractComponentTag", "ArithmeticModule"),
+    "Multiply": ComponentSpec("multiplycomponent", "MultiplyComponentTag", "ArithmeticModule"),
+    "Divide": ComponentSpec("dividecomponent", "DivideComponentTag", "ArithmeticModule"),
+    "Greater": ComponentSpec("greatercomponent", "GreaterComponentTag", "ConditionModule"),
+    "Equal": ComponentSpec("equalscomponent", "EqualsComponentTag", "ConditionModule"),
+    "And": ComponentSpec("andcomponent", "AndComponentTag", "ConditionModule"),
+    "Or": ComponentSpec("orcomponent", "OrComponentTag", "ConditionModule"),
+    "Xor": ComponentSpec("xorcomponent", "XorComponentTag", "ConditionModule"),
+    "SignalCheck": ComponentSpec("signalcheckcomponent", "SignalCheckComponentTag",
+                                 inputs=("signal_in", "set_output", "set_targetsignal"), outputs=("signal_out",)),
+    "Memory": ComponentSpec("memorycomponent", "MemoryComponentTag",
+                            inputs=("signal_in", "signal_store"), outputs=("signal_out",))
+}
+
+_classes: dict[str, type] = {}
+_lock: RLock = RLock()    # a class must be created only once, `isinstance` relies on it
+
+def tag_class(name: str) -> type[tags.ComponentTag]:
+    """Tag class of a `TAGS` entry, created on the first call."""
+    with _lock:
+        if name in _classes:
+            return _classes[name]
+        spec = TAGS[name]
+        base = getattr(tags, spec.base)
+        defaults = dict(spec.defaults)
+        for key, value in base.defaults.items():
+            defaults.setdefault(key, value)
+        _classes[name] = type(name, (base,), {"__module__": tags.__name__, "__doc__": f"\\<{spec.tag_name}> tag.",
+                                              "tag_name": spec.tag_name, "defaults": defaults})
+        return _classes[name]
+
+def component_class(name: str) -> type[components.ComponentModule]:
+    """Module class of a `COMPONENTS` entry, created on the first call."""
+    with _lock:
+        if name in _classes:
+            return _classes[name]
+        spec = COMPONENTS[name]
+        namespace: dict[str, Any] = {"__module__": components.__name__, "name": spec.identifier,
+                                     "component_tag": tag_class(spec.tag)}
+        namespace.update({port: SignalIn() for port in spec.inputs})
+        namespace.update({port: SignalOut() for port in spec.outputs})
+        _classes[name] = type(name, (getattr(components, spec.base),), namespace)
+        return _classes[name]
@@ -1,9 +1,70 @@
-from typing import Any, override
+from typing import Any, Sequence, override
 from abc import abstractmethod
 from .tags import *
-from .. import Module, Tag, SignalIn, SignalOut
+from .. import Module, Tag, SignalIn, SignalOut, IdAllocator
 
-__all__ = ["ComponentModule", "Addition", "Substract", "Multiply", "Divide"]
+__all__ = ["ComponentModule", "CatalogModule"]    # catalog modules (`Addition`, ...) are created on first access
+
+def _wire_tag(wid: Any) -> Tag:
+    """\\<Item> of a wire."""
+    return ItemTag("", identifier="redwire", 
+                   ID=wid, 
+                   rect=(0, 0, 42, 16), 
+                   Tags=("wire", "smallitem"),
+                   SpriteColor=(254, 23, 17, 255),
+                   InventoryIconColor=(254, 23, 17, 255))(
+        HoldableTag(Attached=False, MsgWhenDropped=""),
+        WireTag(nodes=[8, -8, 8, -8])
+    )
+
+def _component_tag(identifier: str, item_id: Any, component_tag: Tag,
+                   inputs: dict[str, list], outputs: dict[str, list]) -> Tag:
+    """\\<Item> of a logical component, `inputs`/`outputs` map connection names to wire IDs."""
+    return ItemTag(name="", identifier=identifier, ID=item_id, rect=(0, 0, 16, 16))(
+        component_tag,
+        HoldableTag()(
+            RequiredItemTag()
+        ),
+        ConnectionPanelTag()(
+            RequiredItemTag(items=("screwdriver",), excludedidentifiers=tuple()),
+            *[InputTag(name)(*[LinkTag(w=wid, i=0) for wid in wires]) for name, wires in inputs.items()],
+            *[OutputTag(name)(*[LinkTag(w=wid, i=1) for wid in wires]) for name, wires in outputs.items()]
+        )
+    )
+
+def _relay_tag(rid: Any, own: Any, childs: list, fan_out: bool) -> Tag:
+    """\\<Item> of a relay passing `signal_in1` to `signal_out1`, `own` links it to its tree parent."""
+    from .catalog import tag_class
+    inputs, outputs = ([own], childs) if fan_out else (childs, [own])
+    return _component_tag("relaycomponent", rid, tag_class("RelayComponentTag")(),
+                          {"power_in": [], "signal_in1": inputs, "signal_in2": [], "toggle": [], "set_state": []},
+                          {"power_out": [], "signal_out1": outputs, "signal_out2": [], "state_out": []})
+
+def _n_relays(n: int, k: int) -> int:
+    """Relays of a tree joining `n` leaves to a root with at most `k` wires per connection."""
+    relays = 0
+    while n > k:
+        n = -(-n // k)
+        relays += n
+    return relays
+
+def _tree(wires: Sequence[int], n: int, k: int, relays: Sequence[int]) -> tuple[list[tuple], list[int]]:
+    """Wires of a tree joining `n` leaves to a root with at most `k` wires per connection.
+
+    Leaf `i` is linked by `wires[i]`, the following wires link the relays level by
+    level. Returns (relay ID, own wire, child wires) of every relay and the wires
+    linked to the root.
+    """
+    nodes = list(wires[:n])
+    tree: list[tuple[int, int, list[int]]] = []
+    while len(nodes) > k:
+        parents: list[int] = []
+        for start in range(0, len(nodes), k):
+            wid = wires[n + len(tree)]
+            tree.append((relays[len(tree)], wid, nodes[start:start + k]))
+            parents.append(wid)
+        nodes = parents
+    return tree, nodes
 
 class _WireModule(Module):
     """Not module - used only to get wire ID."""
@@ -19,36 +80,114 @@ class _WireModule(Module):
     
     @override
     def compile(self) -> list[Tag]:
-        tag = ItemTag("", identifier="redwire", 
-                      ID=self.id, 
-                      rect=(0, 0, 42, 16), 
-                      Tags=("wire", "smallitem"),
-                      SpriteColor=(254, 23, 17, 255),
-                      InventoryIconColor=(254, 23, 17, 255))(
-            HoldableTag(Attached=False, MsgWhenDropped=""),
-            WireTag(nodes=[8, -8, 8, -8])
-        )
-        return [tag]
+        return [_wire_tag(self.id)]
 
 class ComponentModule(Module):
     """Abstarction on Barotrauma logical component."""
     _int_id = True
     name: str | None = None
     component_tag: Tag | None = None
+    delay: int = 1      # updates a signal needs to pass the component
 
     def __pre_init__(self) -> None:
         self._connections: dict[str, list[int]] = {}
         for name in self.input_names + self.output_names:
             self._connections[name] = []
+        self._relay_limit: int | None = None    # wires per connection kept by the relay trees, see `_split`
+        self._relay_ids: range = range(0)
 
     @property
     @abstractmethod
     def tag_args(self) -> dict[str, Any]:
         pass
 
+    @override
+    def _digest_state(self) -> list[str]:
+        state = [repr(self.tag_args), repr(self._connections)]
+        if self._relay_limit is not None:
+            state += [str(self._relay_limit), str(self._relay_ids.start)]
+        return state
+
+    def _split(self, max_links: int, ids: IdAllocator) -> None:
+        """Route connections holding more than `max_links` wires through trees of relays.
+
+        `_connections` keep the logical links, the relays and the wires between
+        them are compiled as internal items with IDs taken from `ids`.
+        """
+        size = 2 * sum([_n_relays(len(wires), max_links) for wires in self._connections.values()])
+        self._relay_limit = max_links if size > 0 else None
+        block = ids.reserve(size) if size > 0 else None
+        self._relay_ids = range(0) if block is None else range(block.start, block.stop)
+
+    def _relay_layout(self) -> dict[str, tuple[range, range]]:
+        """IDs of the relays and of their own wires of every split connection."""
+        layout: dict[str, tuple[range, range]] = {}
+        if self._relay_limit is None:
+            return layout
+        start = self._relay_ids.start
+        for name, wires in self._connections.items():
+            n = _n_relays(len(wires), self._relay_limit)
+            if n > 0:
+                layout[name] = (range(start, start + n), range(start + n, start + 2 * n))
+                start += 2 * n
+        if start > self._relay_ids.stop:
+            raise RuntimeError(f"Connections of {self!r} changed after `allocate_wires`, run it again.")
+        return layout
+
+    def _trees(self) -> dict[str, tuple[list[tuple[int, int, list[int]]], list[int]]]:
+        """Relays of every split connection and the wires left on the connection, see `_tree`."""
+        return {name: _tree([*self._connections[name], *wires], len(self._connections[name]),
+                            self._relay_limit, relays)
+                for name, (relays, wires) in self._relay_layout().items()}
+
+    def _panel(self, names: Sequence[str], trees: dict[str, tuple[list, list[int]]]) -> dict[str, list]:
+        """Wires linked to the connections `names` of the module's own item."""
+        return {name: trees[name][1] if name in trees else self._connections[name] for name in names}
+
+    def _relay_tags(self, trees: dict[str, tuple[list, list[int]]]) -> list[Tag]:
+        """Relays and their own wires of the split connections."""
+        tags: list[Tag] = []
+        for name, (relays, _) in trees.items():
+            fan_out = name in self.output_names
+            tags.extend([_relay_tag(rid, wid, childs, fan_out) for rid, wid, childs in relays])
+            tags.extend([_wire_tag(wid) for _, wid, _ in relays])
+        return tags
+
+    def _internal_items(self) -> tuple[int, int]:
+        """Components and wires compiled besides the module's own item and the wires in `_connections`."""
+        relays = len(self._relay_ids) // 2
+        return relays, relays
+
+    def _panel_links(self) -> list[tuple[str, int]]:
+        """Wire count of every connection of the module's items.
+
+        Connections of the own item are named by port, those of internal items `<item ID>.<connection>`.
+        """
+        trees = self._trees()
+        links = [(name, len(wires)) for name, wires in self._panel(self._connections, trees).items()]
+        for name, (relays, _) in trees.items():
+            connection = "signal_out1" if name in self.output_names else "signal_in1"
+            links.extend([(f"{rid}.{connection}", len(childs)) for rid, _, childs in relays])
+        return links
+
+    def _last_id(self) -> int:
+        """Largest ID of the module's items."""
+        return max(self.id, self._relay_ids.stop - 1)
+
+    @override
+    def _reserve_ids(self, ids: IdAllocator) -> None:
+        if len(self._relay_ids) > 0:
+            block = ids.reserve(len(self._relay_ids))
+            self._relay_ids = range(block.start, block.stop)
+
+    @override
+    def _remap_ids(self, mapping: dict[int, int]) -> None:
+        for wires in self._connections.values():
+            wires[:] = [mapping.get(wid, wid) for wid in wires]
+
     @override
     def _connect_in(self, called_from: Module, signal: SignalIn) -> list[_WireModule]:
-        if signal.handler != self:
+        if signal._module != self._index:
             return []
         wire: Module = _WireModule()
         self._submodules.add(wire)
@@ -57,28 +196,16 @@ class ComponentModule(Module):
     
     @override
     def _connect_out(self, called_from: Module, signal: SignalOut, connect_in: list[_WireModule]) -> None:
-        if signal.handler != self:
+        if signal._module != self._index:
             return
         self._connections[signal.name].extend([w.id for w in connect_in])
 
     @override
     def compile(self) -> list[Tag]:
-        inputs = [InputTag(name)(*[LinkTag(w=wid, i=0) for wid in self._connections[name]]) 
-                  for name in self.input_names]
-        outputs = [OutputTag(name)(*[LinkTag(w=wid, i=1) for wid in self._connections[name]]) 
-                   for name in self.output_names]
-        tag = ItemTag(name="", identifier=self.name, ID=self.id, rect=(0, 0, 16, 16))(
-            self.component_tag(**self.tag_args),
-            HoldableTag()(
-                RequiredItemTag()
-            ),
-            ConnectionPanelTag()(
-                RequiredItemTag(items=("screwdriver",), excludedidentifiers=tuple()),
-                *inputs,
-                *outputs
-            )
-        )
-        tags: list[Tag] = [tag]
+        trees = self._trees()
+        tag = _component_tag(self.name, self.id, self.component_tag(**self.tag_args),
+                             self._panel(self.input_names, trees), self._panel(self.output_names, trees))
+        tags: list[Tag] = [tag, *self._relay_tags(trees)]
         for submodule in self._submodules:
             tags.extend(submodule.compile())
         return tags
@@ -106,22 +233,6 @@ class ArithmeticModule(ComponentModule):
             "ClampMin": self._min
         }
 
-class Addition(ArithmeticModule):
-    name = "addercomponent"
-    component_tag = AdderComponentTag
-
-class Substract(ArithmeticModule):
-    name = "subtractcomponent"
-    component_tag = SubstractComponentTag
-    
-class Multiply(ArithmeticModule):
-    name = "multiplycomponent"
-    component_tag = MultiplyComponentTag
-
-class Divide(ArithmeticModule):
-    name = "dividecomponent"
-    component_tag = DivideComponentTag
-
 class ConditionModule(ComponentModule):
     signal_in1 = SignalIn()
     signal_in2 = SignalIn()
@@ -142,22 +253,21 @@ class ConditionModule(ComponentModule):
             "FalseOutput": self._false_out
         }
     
-class Greater(ConditionModule):
-    name = "greatercomponent"
-    component_tag = GreaterComponentTag
-
-class Equal(ConditionModule):
-    name = "equalscomponent"
-    component_tag = EqualsComponentTag
+class CatalogModule(ComponentModule):
+    """Component defined only by its `catalog` entry, keyword arguments set attributes of its tag."""
+    def __init__(self, **attributes: dict[str, Any]) -> None:
+        unknown = [key for key in attributes if key not in self.component_tag.defaults]
+        if len(unknown) > 0:
+            raise TypeError(f"{self.__class__.__name__} got unexpected attributes {unknown}.")
+        self._attributes = attributes
 
-class And(ConditionModule):
-    name = "andcomponent"
-    component_tag = AndComponentTag
-
-class Or(ConditionModule):
-    name = "orcomponent"
-    component_tag = OrComponentTag
+    @override
+    @property
+    def tag_args(self) -> dict[str, Any]:
+        return dict(self._attributes)
 
-class Xor(ConditionModule):
-    name = "xorcomponent"
-    component_tag = XorComponentTag
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    from . import catalog
+    if name in catalog.COMPONENTS:
+        return catalog.component_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,268 @@
+import heapq
+from collections import deque
+from dataclasses import dataclass
+from functools import cached_property
+from .components import ComponentModule
+from .netlist import Netlist
+from .. import Module, SchemeModule, SignalIn
+
+__all__ = ["Reconvergence", "LatencyAnalysis", "rebalance", "REASSOCIATIVE"]
+
+REASSOCIATIVE: tuple[str, ...] = ("addercomponent", "andcomponent", "orcomponent")
+_FALSY: tuple = (None, "", 0, "0")
+
+@dataclass(frozen=True)
+class Reconvergence:
+    """Paths from one source meeting at `component` with different latencies.
+
+    `source` is a top-level input name or a component, `arrivals` holds the
+    depth at which each input port of `component` receives its signal.
+    """
+    component: ComponentModule
+    source: str | ComponentModule
+    arrivals: tuple[tuple[str, int], ...]
+
+class LatencyAnalysis:
+    """Component depth of every signal of a connected module.
+
+    Each component adds its `delay` (one update for the basic components): a
+    component fed only by top-level inputs has depth 1. Components inside
+    feedback loops have no depth.
+    """
+    def __init__(self, module: Module) -> None:
+        self._netlist = Netlist(module)
+        components = self._netlist.components
+        n = len(components)
+        # sources of each input port: component index or -1-i for i-th top-level input
+        self._fanin: list[dict[str, list[int]]] = [{name: [] for name in c.input_names} for c in components]
+        successors: list[list[int]] = [[] for _ in range(n)]
+        indegree: list[int] = [0] * n
+        for _, (driver, _), (sink, port) in self._netlist.links:
+            self._fanin[sink][port].append(driver)
+            successors[driver].append(sink)
+            indegree[sink] += 1
+        for i, name in enumerate(module.input_names):
+            for sink, port in self._netlist.inputs[name]:
+                self._fanin[sink][port].append(-1 - i)
+        self._depths: list[int | None] = [None] * n
+        queue = deque(i for i in range(n) if indegree[i] == 0)
+        while queue:
+            idx = queue.popleft()
+            self._depths[idx] = components[idx].delay + max([self.arrival(idx, p) for p in self._fanin[idx]] + [0])
+            for succ in successors[idx]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    queue.append(succ)
+
+    @property
+    def netlist(self) -> Netlist:
+        return self._netlist
+
+    def _source_depth(self, source: int) -> int | None:
+        return 0 if source < 0 else self._depths[source]
+
+    def arrival(self, index: int, port: str) -> int:
+        """Depth at which input `port` of the `index`-th component receives its signal."""
+        depths = [self._source_depth(s) for s in self._fanin[index][port]]
+        return max([d for d in depths if d is not None] + [0])
+
+    def depth(self, component: ComponentModule) -> int | None:
+        return self._depths[self._netlist.index(component)]
+
+    @property
+    def depths(self) -> dict[ComponentModule, int | None]:
+        return dict(zip(self._netlist.components, self._depths))
+
+    @property
+    def cyclic(self) -> tuple[ComponentModule, ...]:
+        return tuple(c for c, d in zip(self._netlist.components, self._depths) if d is None)
+
+    @property
+    def output_depths(self) -> dict[str, int]:
+        return {name: max([self._depths[i] or 0 for i, _ in drivers] + [0])
+                for name, drivers in self._netlist.outputs.items()}
+
+    @cached_property
+    def critical_path(self) -> tuple[ComponentModule, ...]:
+        """Longest chain of components, from the first one to the one driving an output."""
+        ends = [i for drivers in self._netlist.outputs.values() for i, _ in drivers]
+        if len(ends) == 0:
+            ends = list(range(len(self._depths)))
+        ends = [i for i in ends if self._depths[i] is not None]
+        if len(ends) == 0:
+            return tuple()
+        current = max(ends, key=lambda i: self._depths[i])
+        path: list[int] = [current]
+        while True:
+            sources = [s for port in self._fanin[current].values() for s in port
+                       if s >= 0 and self._depths[s] is not None]
+            if len(sources) == 0:
+                break
+            current = max(sources, key=lambda s: self._depths[s])
+            path.append(current)
+        return tuple(self._netlist.components[i] for i in reversed(path))
+
+    @property
+    def critical_depth(self) -> int:
+        return sum([c.delay for c in self.critical_path])
+
+    def _cone(self, sources: list[int]) -> deque:
+        """Breadth-first fan-in cone of the given sources, nearest first."""
+        order: deque = deque()
+        visited: set[int] = set()
+        queue = deque(sources)
+        while queue:
+            source = queue.popleft()
+            if source in visited:
+                continue
+            visited.add(source)
+            order.append(source)
+            if source >= 0:
+                for port in self._fanin[source].values():
+                    queue.extend(port)
+        return order
+
+    @cached_property
+    def reconvergences(self) -> tuple[Reconvergence, ...]:
+        """Components whose inputs share a source but arrive at different depths."""
+        found: list[Reconvergence] = []
+        names = self._netlist.module.input_names
+        for idx, fanin in enumerate(self._fanin):
+            arrivals = {port: self.arrival(idx, port) for port, sources in fanin.items() if sources}
+            if len(set(arrivals.values())) < 2:
+                continue
+            ports = sorted(arrivals, key=arrivals.get)
+            early = set(self._cone(fanin[ports[0]]))
+            common = next((s for s in self._cone(fanin[ports[-1]]) if s in early), None)
+            if common is None:
+                continue
+            source = names[-1 - common] if common < 0 else self._netlist.components[common]
+            found.append(Reconvergence(self._netlist.components[idx], source,
+                                       tuple((p, arrivals[p]) for p in ports)))
+        return tuple(found)
+
+def _schemes(module: Module) -> list[SchemeModule]:
+    found: list[SchemeModule] = []
+    stack: list[Module] = [module]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, SchemeModule):
+            found.append(current)
+            stack.extend(current._submodules)
+    return found
+
+def rebalance(module: Module, kinds: tuple[str, ...] = REASSOCIATIVE) -> int:
+    """Rewire chains of one associative component kind into trees of minimal depth.
+
+    A chain is a group of components with the same identifier and settings where
+    every member but the last drives only the next one. Its operands are regrouped
+    so that the earliest arriving ones are combined first; components and wires
+    are reused, only their links change. Clamps of intermediate results are not
+    preserved by regrouping, `visualization` keeps showing the original connections.
+
+    Args:
+        module: Connected top-level module, rewired in place.
+        kinds: Identifiers of the components allowed to be regrouped.
+
+    Returns:
+        Number of rebuilt chains.
+    """
+    analysis = LatencyAnalysis(module)
+    netlist = analysis.netlist
+    components = netlist.components
+    outputs = {i for drivers in netlist.outputs.values() for i, _ in drivers}
+
+    def signature(idx: int) -> tuple | None:
+        component = components[idx]
+        if component.name not in kinds or analysis._depths[idx] is None:
+            return None
+        if "set_output" in component.input_names and analysis._fanin[idx]["set_output"]:
+            return None
+        args = component.tag_args
+        if "Output" in args and (args["Output"] in _FALSY or args["FalseOutput"] not in _FALSY):
+            return None
+        return (component.name, tuple(args.items()))
+
+    signatures = [signature(i) for i in range(len(components))]
+    links_from: dict[int, list[tuple[int, int, str]]] = {}
+    for wid, (driver, _), (sink, port) in netlist.links:
+        links_from.setdefault(driver, []).append((wid, sink, port))
+    parent: dict[int, tuple[int, str, int]] = {}
+    for idx, sig in enumerate(signatures):
+        if sig is None or idx in outputs or len(links_from.get(idx, [])) != 1:
+            continue
+        wid, sink, port = links_from[idx][0]
+        if signatures[sink] == sig and analysis._fanin[sink][port] == [idx]:
+            parent[idx] = (sink, port, wid)
+    children: dict[int, dict[str, int]] = {}
+    for child, (sink, port, _) in parent.items():
+        children.setdefault(sink, {})[port] = child
+
+    owners: dict[int, tuple[ComponentModule, Module]] = {}
+    remap: dict[SignalIn, SignalIn] = {}
+    rebuilt = 0
+    for root in range(len(components)):
+        if signatures[root] is None or root in parent or root not in children:
+            continue
+        nodes: list[int] = []
+        leaves: list[tuple[int, str]] = []
+        wires: list[int] = []
+        stack = [root]
+        while stack:
+            idx = stack.pop()
+            nodes.append(idx)
+            for port in ("signal_in1", "signal_in2"):
+                child = children.get(idx, {}).get(port)
+                if child is None:
+                    leaves.append((idx, port))
+                else:
+                    wires.append(parent[child][2])
+                    stack.append(child)
+        if len(nodes) < 3:
+            continue
+        heap = [(analysis.arrival(i, p), n, ("leaf", (i, p))) for n, (i, p) in enumerate(leaves)]
+        heapq.heapify(heap)
+        order = len(heap)
+        free = [i for i in nodes if i != root]
+        plan: list[tuple[int, tuple, tuple]] = []
+        while len(heap) > 1:
+            depth1, _, op1 = heapq.heappop(heap)
+            depth2, _, op2 = heapq.heappop(heap)
+            node = root if len(heap) == 0 else free.pop()
+            plan.append((node, op1, op2))
+            heapq.heappush(heap, (max(depth1, depth2) + 1, order, ("node", node)))
+            order += 1
+        if max(d for d, _, _ in heap) >= analysis._depths[root]:
+            continue
+        for idx in nodes:
+            for child in components[idx]._submodules:
+                owners[child.id] = (components[idx], child)
+        contents = {(i, p): list(components[i]._connections[p]) for i, p in leaves}
+        for idx in nodes:
+            for port in ("signal_in1", "signal_in2"):
+                components[idx]._connections[port].clear()
+            if idx != root:
+                components[idx]._connections["signal_out"].clear()
+        for node, *operands in plan:
+            target = components[node]
+            for port, (kind, value) in zip(("signal_in1", "signal_in2"), operands):
+                if kind == "leaf":
+                    moved = contents[value]
+                    remap[getattr(components[value[0]], value[1])] = getattr(target, port)
+                else:
+                    moved = [wires.pop()]
+                    components[value]._connections["signal_out"].append(moved[0])
+                target._connections[port].extend(moved)
+                for wid in moved:
+                    owner, wire = owners[wid]
+                    owner._submodules.discard(wire)
+                    target._submodules.add(wire)
+        rebuilt += 1
+    if remap:
+        for scheme in _schemes(module):
+            scheme._flat_table.clear()
+            for name, handles in scheme._lookup_table.items():
+                for i, s in enumerate(scheme._lookup(name)):
+                    if s in remap:
+                        handles[2 * i], handles[2 * i + 1] = remap[s]._module, remap[s]._port
+    return rebuilt
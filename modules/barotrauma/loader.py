@@ -0,0 +1,177 @@
+import gzip
+from pathlib import Path
+from typing import Any, Callable, Collection
+from xml.parsers import expat
+from .. import Tag
+from ..utils import DEFAULT_RULES
+
+__all__ = ["RawTag", "load_submarine", "save_submarine", "merge_submarine", "max_item_id"]
+
+def _escape(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+# loaded attribute values are plain strings, escape them on output
+_RULES: dict[type, Callable[[Any], str]] = {**DEFAULT_RULES, str: _escape}
+
+class RawTag(Tag):
+    """Tag kept as its original XML text and written back verbatim while untouched.
+
+    Only the attributes of the element itself are available, `parse` builds the
+    full tree. Once attributes are set or children added, the tag is written
+    from the parsed tree with these changes applied.
+    """
+    _dirty: bool = False
+
+    def __init__(self, tag_name: str, text: str, /, **kwds: dict[str, Any]) -> None:
+        super().__init__(tag_name, _RULES, **kwds)
+        self._text: str = text
+
+    @property
+    def text(self) -> str:
+        return self.render() if self._dirty else self._text
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the tag was changed since loading."""
+        return self._dirty
+
+    def __setitem__(self, attribute: str, value: Any) -> None:
+        self._dirty = True
+        super().__setitem__(attribute, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if "_text" in self.__dict__ and name in self._attributes:
+            object.__setattr__(self, "_dirty", True)
+        super().__setattr__(name, value)
+
+    def add_childs(self, *child: list[Tag]) -> None:
+        self._dirty = True
+        super().add_childs(*child)
+
+    def parse(self) -> Tag:
+        loader = _Loader(skip=tuple(), lazy=False)
+        loader.feed(self._text.encode())
+        tag = loader.close()
+        if self._dirty:
+            tag = Tag(self._name, _RULES, **self._attributes)(*tag.childs, *self._childs)
+        return tag
+
+    def _write(self, parts: list[str], indent: str | None) -> None:
+        if self._dirty:
+            self.parse()._write(parts, indent)
+        else:
+            parts.append(self._text)
+
+class _Loader:
+    """Incremental expat parser building a `Tag` tree.
+
+    With `lazy`, children of the root are kept as `RawTag` slices of the input.
+    """
+    def __init__(self, skip: Collection[str], lazy: bool) -> None:
+        self._skip = frozenset(skip)
+        self._lazy = lazy
+        self._parser = expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._root: Tag | None = None
+        self._stack: list[Tag] = []
+        self._depth: int = 0
+        self._skip_depth: int | None = None
+        self._buffer: bytearray = bytearray()
+        self._base: int = 0     # input offset of self._buffer[0]
+        self._pending: tuple[str, dict[str, str], int] | None = None
+
+    def _flush(self, end: int) -> None:
+        if self._pending is not None:
+            name, attrs, start = self._pending
+            text = self._buffer[start - self._base:end - self._base].decode().rstrip()
+            self._root.add_childs(RawTag(name, text, **attrs))
+            self._pending = None
+        del self._buffer[:end - self._base]
+        self._base = end
+
+    def _start(self, name: str, attrs: dict[str, str]) -> None:
+        self._depth += 1
+        if self._skip_depth is not None:
+            return
+        if self._root is None:
+            self._root = Tag(name, _RULES, **attrs)
+            self._stack.append(self._root)
+            if self._lazy:
+                self._flush(self._parser.CurrentByteIndex)
+            return
+        if self._lazy:
+            if self._depth == 2:
+                self._flush(self._parser.CurrentByteIndex)
+                if name in self._skip:
+                    self._skip_depth = self._depth
+                else:
+                    self._pending = (name, attrs, self._parser.CurrentByteIndex)
+            return
+        if name in self._skip:
+            self._skip_depth = self._depth
+            return
+        tag = Tag(name, _RULES, **attrs)
+        self._stack[-1].add_childs(tag)
+        self._stack.append(tag)
+
+    def _end(self, name: str) -> None:
+        self._depth -= 1
+        if self._skip_depth is not None:
+            if self._skip_depth > self._depth:
+                self._skip_depth = None
+            return
+        if self._lazy and self._depth == 0:
+            self._flush(self._parser.CurrentByteIndex)
+        if not self._lazy or self._depth == 0:
+            self._stack.pop()
+
+    def feed(self, data: bytes) -> None:
+        if self._lazy:
+            self._buffer.extend(data)
+        self._parser.Parse(data, False)
+
+    def close(self) -> Tag:
+        self._parser.Parse(b"", True)
+        if self._root is None:
+            raise ValueError("Document has no root element.")
+        return self._root
+
+def load_submarine(path: Path | str, skip: Collection[str] = tuple(),
+                   lazy: bool = True, chunk_size: int = 1 << 20) -> Tag:
+    """Stream a .sub file (gzip-compressed or plain XML) into tags.
+
+    Args:
+        path: Submarine file.
+        skip: Tag names of the elements dropped together with their subtrees.
+            In lazy mode only direct children of the root are checked.
+        lazy: Keep direct children of the root as `RawTag` objects holding
+            their original text instead of parsing whole subtrees.
+        chunk_size: Size of the decompressed blocks fed to the parser.
+
+    Returns:
+        Root tag (usually <Submarine>).
+    """
+    path = Path(path)
+    with path.open("rb") as file:
+        compressed = file.read(2) == b"\x1f\x8b"
+    loader = _Loader(skip, lazy)
+    with (gzip.open(path, "rb") if compressed else path.open("rb")) as file:
+        while chunk := file.read(chunk_size):
+            loader.feed(chunk)
+    return loader.close()
+
+def save_submarine(tag: Tag, path: Path | str) -> None:
+    """Write a (loaded) tag tree as gzip-compressed .sub file, unchanged `RawTag` children are copied verbatim."""
+    with gzip.open(path, "wt") as file:
+        file.write(str(tag))
+
+def merge_submarine(base: Tag, *tags: Tag) -> Tag:
+    """New root with the attributes and children of a loaded `base` followed by `tags`."""
+    return Tag(base.tagname, _RULES, **dict(base.attributes))(*base.childs, *tags)
+
+def max_item_id(tag: Tag) -> int:
+    """Largest item ID among the children of a loaded submarine, 0 if there are none."""
+    ids = [int(child["ID"]) for child in tag.childs if str(child["ID"] or "").isdigit()]
+    return max(ids + [0])
@@ -0,0 +1,212 @@
+import re
+from hashlib import sha256
+from typing import Any, Sequence, override
+from .components import ComponentModule, _component_tag, _wire_tag, _relay_tag, _n_relays, _tree
+from .catalog import tag_class
+from .wiring import MAX_LINKS
+from .. import Tag, SignalIn, SignalOut, IdAllocator
+from ..utils import Stringifier
+
+__all__ = ["LookupTable"]
+
+def _hole(index: int) -> str:
+    return f"\x00{index}\x00"
+
+class _Template:
+    """Serialized tag with holes filled per item, so equal items are not built tag by tag."""
+    def __init__(self, tag: Tag) -> None:
+        fill = lambda text: re.sub("\x00(\\d+)\x00", r"{\1}", text.replace("{", "{{").replace("}", "}}"))
+        self._pretty: str = fill(tag.render(True))
+        self._texts: dict[str | None, str] = {None: fill(tag.render(False))}
+
+    def text(self, indent: str | None) -> str:
+        if indent not in self._texts:
+            self._texts[indent] = self._pretty.replace("\n", f"\n{indent}")
+        return self._texts[indent]
+
+class _TemplateTag(Tag):
+    """Item written from a `_Template`, only identifier and ID are kept as attributes."""
+    def __init__(self, template: _Template, identifier: str, values: tuple) -> None:
+        self._name: str = "Item"
+        self._attributes: dict[str, Any] = {"identifier": identifier, "ID": values[0]}
+        self._childs: list[Tag] = []
+        self._template = template
+        self._values = values
+
+    def _write(self, parts: list[str], indent: str | None) -> None:
+        parts.append(self._template.text(indent).format(*self._values))
+
+class LookupTable(ComponentModule):
+    """ROM returning `values[i]` when `keys[i]` arrives at `address`.
+
+    The table is built as one block of items: an input memory holding the
+    address, a signal check per entry comparing it with the entry key, a memory
+    per entry holding its value (editable in game; with `memory=False` values
+    are stored in the checks) and an output memory keeping the last value found.
+    A lookup takes 3 updates, `value` holds the previous result until then and
+    for unknown addresses. Items get consecutive IDs right after the table's own
+    ID and are compiled from shared templates, not as separate modules.
+
+    No connection holds more than `max_links` wires: the address reaches the
+    checks through a tree of relays, the found values reach the output memory
+    through another one. Relays forward signals within the same update, so
+    they do not add to the delay.
+
+    Args:
+        values: Entry values, e.g. a NumPy array.
+        keys: Entry addresses, 0, 1, 2, ... by default.
+        memory: Keep the values in memory components.
+        max_links: Wire limit of a single connection.
+    """
+    name = "lookuptable"
+    address = SignalIn()
+    value = SignalOut()
+    delay = 3
+
+    def __init__(self, values: Sequence[Any], keys: Sequence[Any] | None = None, memory: bool = True,
+                 max_links: int = MAX_LINKS) -> None:
+        self._values: list[Any] = values.tolist() if hasattr(values, "tolist") else list(values)
+        if keys is None:
+            self._keys: list[Any] = list(range(len(self._values)))
+        else:
+            self._keys = keys.tolist() if hasattr(keys, "tolist") else list(keys)
+        if len(self._values) == 0:
+            raise ValueError("Lookup table without entries.")
+        if len(self._keys) != len(self._values):
+            raise ValueError(f"Got {len(self._keys)} keys for {len(self._values)} values.")
+        if len(set(map(str, self._keys))) != len(self._keys):
+            raise ValueError("Keys of a lookup table must be unique.")
+        if max_links < 2:
+            raise ValueError(f"A lookup table needs at least 2 links per connection, got {max_links}.")
+        self._memory = memory
+        self._max_links = max_links
+        self._table_digest = sha256(repr((self._keys, self._values)).encode()).hexdigest()
+        self._reserve_ids(IdAllocator.current())
+
+    @property
+    def keys(self) -> tuple[Any, ...]:
+        return tuple(self._keys)
+
+    @property
+    def values(self) -> tuple[Any, ...]:
+        return tuple(self._values)
+
+    @property
+    def max_links(self) -> int:
+        return self._max_links
+
+    @property
+    def n_relays(self) -> int:
+        """Number of relays of each of the two trees."""
+        return _n_relays(len(self._values), self._max_links)
+
+    @property
+    def n_items(self) -> int:
+        """Number of items besides the table's own one (the input memory)."""
+        return sum(self._sizes().values())
+
+    @override
+    @property
+    def tag_args(self) -> dict[str, Any]:
+        return {}
+
+    @override
+    def _reserve_ids(self, ids: IdAllocator) -> None:
+        self._first: int = ids.reserve(self.n_items).start
+        super()._reserve_ids(ids)
+
+    @override
+    def _digest_state(self) -> list[str]:
+        return super()._digest_state() + [self._table_digest, str(self._memory), str(self._max_links),
+                                          str(self._first)]
+
+    @override
+    def _internal_items(self) -> tuple[int, int]:
+        sizes = self._sizes()
+        wires = sizes["wires_in"] + sizes["wires_set"] + sizes["wires_out"]
+        relays, relay_wires = super()._internal_items()
+        return self.n_items - wires + relays, wires + relay_wires
+
+    @override
+    def _panel_links(self) -> list[tuple[str, int]]:
+        layout = self._layout()
+        relays_in, roots_in = _tree(layout["wires_in"], len(self._values), self._max_links, layout["relays_in"])
+        relays_out, roots_out = _tree(layout["wires_out"], len(self._values), self._max_links, layout["relays_out"])
+        links = super()._panel_links()
+        links += [(f"{self.id}.signal_out", len(roots_in)), (f"{layout['output'][0]}.signal_in", len(roots_out))]
+        links.extend([(f"{rid}.signal_out1", len(childs)) for rid, _, childs in relays_in])
+        links.extend([(f"{rid}.signal_in1", len(childs)) for rid, _, childs in relays_out])
+        return links
+
+    @override
+    def _last_id(self) -> int:
+        return max(super()._last_id(), self._first + self.n_items - 1)
+
+    def _sizes(self) -> dict[str, int]:
+        """Number of items of each part of the table, in ID order."""
+        n = len(self._values)
+        relays = _n_relays(n, self._max_links)
+        stored = n if self._memory else 0
+        return {"output": 1, "checks": n, "memories": stored, "relays_in": relays, "relays_out": relays,
+                "wires_in": n + relays, "wires_set": stored, "wires_out": n + relays}
+
+    def _layout(self) -> dict[str, range]:
+        """Item IDs of each part of the table."""
+        layout: dict[str, range] = {}
+        start = self._first
+        for part, size in self._sizes().items():
+            layout[part] = range(start, start + size)
+            start += size
+        return layout
+
+    @override
+    def compile(self) -> list[Tag]:
+        layout = self._layout()
+        n = len(self._values)
+        relays_in, roots_in = _tree(layout["wires_in"], n, self._max_links, layout["relays_in"])
+        relays_out, roots_out = _tree(layout["wires_out"], n, self._max_links, layout["relays_out"])
+        trees = self._trees()
+        memory_tag = tag_class("MemoryComponentTag")
+        check_tag = tag_class("SignalCheckComponentTag")
+        tags: list[Tag] = [
+            _component_tag("memorycomponent", self.id, memory_tag(Value="", Writable=True),
+                           {"signal_in": self._panel(["address"], trees)["address"], "signal_store": []},
+                           {"signal_out": roots_in}),
+            _component_tag("memorycomponent", layout["output"][0], memory_tag(Value="", Writable=True),
+                           {"signal_in": roots_out, "signal_store": []},
+                           {"signal_out": self._panel(["value"], trees)["value"]}),
+            *self._relay_tags(trees)
+        ]
+        set_output = [_hole(4)] if self._memory else []
+        check = _Template(_component_tag(
+            "signalcheckcomponent", _hole(0),
+            check_tag(TargetSignal=_hole(1), Output=_hole(2), FalseOutput=""),
+            {"signal_in": [_hole(3)], "set_output": set_output, "set_targetsignal": []},
+            {"signal_out": [_hole(5)]}))
+        stringify = Stringifier()
+        keys = [stringify(k) for k in self._keys]
+        values = [stringify(v) for v in self._values]
+        wires_set = layout["wires_set"] if self._memory else [None] * len(values)
+        tags.extend([_TemplateTag(check, "signalcheckcomponent", items)
+                     for items in zip(layout["checks"], keys, values, layout["wires_in"],
+                                      wires_set, layout["wires_out"])])
+        if self._memory:
+            memory = _Template(_component_tag(
+                "memorycomponent", _hole(0), memory_tag(Value=_hole(1), Writable=False),
+                {"signal_in": [], "signal_store": []}, {"signal_out": [_hole(2)]}))
+            tags.extend([_TemplateTag(memory, "memorycomponent", items)
+                         for items in zip(layout["memories"], values, layout["wires_set"])])
+        relays: dict[tuple[bool, int], _Template] = {}
+        for fan_out, tree in ((True, relays_in), (False, relays_out)):
+            for rid, wid, childs in tree:
+                key = (fan_out, len(childs))
+                if key not in relays:
+                    relays[key] = _Template(_relay_tag(_hole(0), _hole(1),
+                                                       [_hole(i + 2) for i in range(len(childs))], fan_out))
+                tags.append(_TemplateTag(relays[key], "relaycomponent", (rid, wid, *childs)))
+        wire = _Template(_wire_tag(_hole(0)))
+        for part in ("wires_in", "wires_set", "wires_out"):
+            tags.extend([_TemplateTag(wire, "redwire", (wid,)) for wid in layout[part]])
+        for submodule in self._submodules:
+            tags.extend(submodule.compile())
+        return tags
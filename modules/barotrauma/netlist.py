@@ -0,0 +1,89 @@
+from .components import ComponentModule
+from .. import Module, SchemeModule, Signal
+
+__all__ = ["Netlist"]
+
+class Netlist:
+    """Flat view of the components and wires of a connected module.
+
+    Components are ordered by ID; ports are addressed as (component index, port name).
+    """
+    def __init__(self, module: Module) -> None:
+        self._module = module
+        components: list[ComponentModule] = []
+        stack: list[Module] = [module]
+        visited: set[int] = set()
+        while stack:
+            current = stack.pop()
+            if id(current) in visited:
+                continue
+            visited.add(id(current))
+            if isinstance(current, ComponentModule):
+                components.append(current)
+                continue
+            stack.extend(current._submodules)
+        components.sort(key=lambda c: c.id)
+        self._components: tuple[ComponentModule, ...] = tuple(components)
+        self._index: dict[int, int] = {id(c): i for i, c in enumerate(components)}
+        drivers: dict[int, tuple[int, str]] = {}
+        sinks: dict[int, tuple[int, str]] = {}
+        for idx, component in enumerate(components):
+            for name in component.output_names:
+                for wid in component._connections[name]:
+                    drivers[wid] = (idx, name)
+            for name in component.input_names:
+                for wid in component._connections[name]:
+                    sinks[wid] = (idx, name)
+        self._links: tuple[tuple[int, tuple[int, str], tuple[int, str]], ...] = tuple(
+            (wid, drivers[wid], sinks[wid]) for wid in sorted(sinks) if wid in drivers
+        )
+        self._inputs: dict[str, list[tuple[int, str]]] = {
+            name: self._resolve(module, name) for name in module.input_names
+        }
+        self._outputs: dict[str, list[tuple[int, str]]] = {
+            name: self._resolve(module, name) for name in module.output_names
+        }
+
+    def _resolve(self, module: Module, name: str) -> list[tuple[int, str]]:
+        """Follow a port of `module` through the scheme lookup tables down to component ports."""
+        if isinstance(module, ComponentModule):
+            return [(self._index[id(module)], name)]
+        resolved: list[tuple[int, str]] = []
+        stack: list[Signal] = list(reversed(module._lookup(name)))
+        while stack:
+            signal = stack.pop()
+            handler = signal.handler
+            if isinstance(handler, SchemeModule):
+                stack.extend(reversed(handler._lookup(signal.name)))
+            elif id(handler) in self._index:
+                resolved.append((self._index[id(handler)], signal.name))
+        return resolved
+
+    @property
+    def module(self) -> Module:
+        return self._module
+
+    @property
+    def components(self) -> tuple[ComponentModule, ...]:
+        return self._components
+
+    @property
+    def links(self) -> tuple[tuple[int, tuple[int, str], tuple[int, str]], ...]:
+        """Wires as (wire ID, (driver index, output name), (sink index, input name))."""
+        return self._links
+
+    @property
+    def inputs(self) -> dict[str, list[tuple[int, str]]]:
+        """Component input ports fed by every top-level input."""
+        return self._inputs
+
+    @property
+    def outputs(self) -> dict[str, list[tuple[int, str]]]:
+        """Component output ports driving every top-level output."""
+        return self._outputs
+
+    def index(self, component: ComponentModule) -> int:
+        return self._index[id(component)]
+
+    def __len__(self) -> int:
+        return len(self._components)
@@ -0,0 +1,240 @@
+from typing import Any, Callable, Mapping
+import numpy as np
+from numpy.typing import ArrayLike
+from .netlist import Netlist
+from .lookup import LookupTable
+from .. import Module
+
+__all__ = ["Simulator"]
+
+def _truthy(x: np.ndarray) -> np.ndarray:
+    return ~np.isnan(x) & (x != 0)
+
+_ARITHMETIC: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "addercomponent": np.add,
+    "subtractcomponent": np.subtract,
+    "multiplycomponent": np.multiply,
+    "dividecomponent": lambda a, b: np.where(b == 0, np.nan, a / np.where(b == 0, 1, b))
+}
+
+_CONDITION: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "greatercomponent": np.greater,
+    "equalscomponent": np.equal,
+    "andcomponent": lambda a, b: _truthy(a) & _truthy(b),
+    "orcomponent": lambda a, b: _truthy(a) | _truthy(b),
+    "xorcomponent": lambda a, b: _truthy(a) ^ _truthy(b)
+}
+
+# hidden rows of a lookup table: latched address and the entry found on the previous update
+_LOOKUP_STAGES: tuple[str, ...] = ("~address", "~selected")
+
+def _numeric(value: Any) -> float:
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Only numeric outputs can be simulated (got {value!r}).") from None
+
+class _Group:
+    """Components of one kind evaluated together."""
+    def __init__(self, kind: str, rows: list[int], sources: dict[str, list[list[int]]]) -> None:
+        self.kind = kind
+        self.low: np.ndarray | None = None
+        self.high: np.ndarray | None = None
+        self.true_out: np.ndarray | None = None
+        self.false_out: np.ndarray | None = None
+        self.keys: np.ndarray | None = None
+        self.table: np.ndarray | None = None
+        self.rows = np.array(rows, dtype=np.intp)
+        self.sources: dict[str, np.ndarray] = {}
+        for port, lists in sources.items():
+            width = max([len(s) for s in lists] + [1])
+            # row 0 always holds NaN ("no signal"), used as padding
+            table = np.zeros((len(lists), width), dtype=np.intp)
+            for i, s in enumerate(lists):
+                table[i, :len(s)] = s
+            self.sources[port] = table
+
+class Simulator:
+    """Vectorized tick-by-tick simulation of the arithmetic and condition components and lookup tables.
+
+    Every column of the state is an independent input vector, so thousands of cases
+    are evaluated at once. Signals are floats, NaN stands for "no signal". Each tick
+    all components read the values their drivers produced on the previous tick.
+    """
+    def __init__(self, module: Module) -> None:
+        self._netlist = Netlist(module)
+        components = self._netlist.components
+        self._input_names: tuple[str, ...] = module.input_names
+        self._output_names: tuple[str, ...] = module.output_names
+        n_inputs = len(self._input_names)
+        self._rows: dict[tuple[int, str], int] = {}
+        for idx, component in enumerate(components):
+            stages = _LOOKUP_STAGES if isinstance(component, LookupTable) else tuple()
+            for name in stages + component.output_names:
+                self._rows[(idx, name)] = 1 + n_inputs + len(self._rows)
+        self._n_rows: int = 1 + n_inputs + len(self._rows)
+        feeds: dict[tuple[int, str], list[int]] = {}
+        for _, driver, sink in self._netlist.links:
+            feeds.setdefault(sink, []).append(self._rows[driver])
+        for i, name in enumerate(self._input_names):
+            for sink in self._netlist.inputs[name]:
+                feeds.setdefault(sink, []).append(1 + i)
+        self._outputs: dict[str, list[int]] = {
+            name: [self._rows[driver] for driver in self._netlist.outputs[name]]
+            for name in self._output_names
+        }
+        kinds: dict[str, list[int]] = {}
+        self._groups: list[_Group] = []
+        for idx, component in enumerate(components):
+            if isinstance(component, LookupTable):
+                self._groups.append(self._lookup_group(idx, component, feeds))
+                continue
+            if component.name not in _ARITHMETIC and component.name not in _CONDITION:
+                raise NotImplementedError(f"Simulation of '{component.name}' is not supported.")
+            kinds.setdefault(component.name, []).append(idx)
+        for kind, indices in kinds.items():
+            group = _Group(kind,
+                           [self._rows[(i, "signal_out")] for i in indices],
+                           {port: [feeds.get((i, port), []) for i in indices]
+                            for port in components[indices[0]].input_names})
+            if kind in _ARITHMETIC:
+                group.low = np.array([components[i]._min for i in indices], dtype=np.float64)[:, None]
+                group.high = np.array([components[i]._max for i in indices], dtype=np.float64)[:, None]
+            else:
+                group.true_out = np.array([_numeric(components[i]._true_out) for i in indices])[:, None]
+                group.false_out = np.array([_numeric(components[i]._false_out) for i in indices])[:, None]
+            self._groups.append(group)
+        self._max_ticks: int = sum([c.delay for c in components]) + 1
+        self._tick: int = 0
+        self.reset(1)
+
+    def _lookup_group(self, idx: int, table: LookupTable, feeds: dict[tuple[int, str], list[int]]) -> _Group:
+        group = _Group(table.name, [self._rows[(idx, name)] for name in _LOOKUP_STAGES + ("value",)],
+                       {"address": [feeds.get((idx, "address"), [])]})
+        keys = np.array([_numeric(k) for k in table.keys])
+        order = np.argsort(keys)
+        group.keys = keys[order]
+        group.table = np.array([_numeric(v) for v in table.values])[order]
+        return group
+
+    @property
+    def netlist(self) -> Netlist:
+        return self._netlist
+
+    @property
+    def input_names(self) -> tuple[str, ...]:
+        return self._input_names
+
+    @property
+    def output_names(self) -> tuple[str, ...]:
+        return self._output_names
+
+    @property
+    def batch_size(self) -> int:
+        return self._values.shape[1]
+
+    @property
+    def tick(self) -> int:
+        return self._tick
+
+    def reset(self, batch_size: int) -> None:
+        """Drop all signals and component state, keep `batch_size` parallel vectors."""
+        self._values: np.ndarray = np.full((self._n_rows, batch_size), np.nan)
+        self._true_out: list[np.ndarray | None] = [
+            np.repeat(g.true_out, batch_size, axis=1) if g.kind in _CONDITION else None
+            for g in self._groups
+        ]
+        self._tick = 0
+
+    def _columns(self, inputs: Mapping[str, ArrayLike] | ArrayLike) -> dict[str, np.ndarray]:
+        if isinstance(inputs, Mapping):
+            for name in inputs:
+                if name not in self._input_names:
+                    raise KeyError(f"Unknown input '{name}'.")
+            return {k: np.asarray(v, dtype=np.float64) for k, v in inputs.items()}
+        array = np.asarray(inputs, dtype=np.float64)
+        if array.ndim == 1:
+            array = array[:, None]
+        if array.shape[1] != len(self._input_names):
+            raise ValueError(f"Expected {len(self._input_names)} input columns, got {array.shape[1]}.")
+        return {name: array[:, i] for i, name in enumerate(self._input_names)}
+
+    def set_inputs(self, inputs: Mapping[str, ArrayLike] | ArrayLike) -> None:
+        """Set top-level inputs, either by name or as (batch, n_inputs) array in `input_names` order."""
+        for name, value in self._columns(inputs).items():
+            self._values[1 + self._input_names.index(name)] = value
+
+    def _gather(self, sources: np.ndarray) -> np.ndarray:
+        value = self._values[sources[:, 0]]
+        for j in range(1, sources.shape[1]):
+            candidate = self._values[sources[:, j]]
+            value = np.where(np.isnan(candidate), value, candidate)
+        return value
+
+    def _lookup(self, group: _Group) -> np.ndarray:
+        """Next values of the latched address, the found entry and the output of a lookup table."""
+        address = self._gather(group.sources["address"])[0]
+        latched, selected, value = self._values[group.rows]
+        position = np.clip(np.searchsorted(group.keys, latched), 0, len(group.keys) - 1)
+        found = np.where(group.keys[position] == latched, group.table[position], np.nan)
+        return np.stack([np.where(np.isnan(address), latched, address), found,
+                         np.where(np.isnan(selected), value, selected)])
+
+    def step(self) -> None:
+        """Advance the simulation by one tick."""
+        results: list[np.ndarray] = []
+        with np.errstate(invalid="ignore", over="ignore"):
+            for group, true_out in zip(self._groups, self._true_out):
+                if group.keys is not None:
+                    results.append(self._lookup(group))
+                    continue
+                in1 = self._gather(group.sources["signal_in1"])
+                in2 = self._gather(group.sources["signal_in2"])
+                if group.kind in _ARITHMETIC:
+                    out = np.clip(_ARITHMETIC[group.kind](in1, in2), group.low, group.high)
+                else:
+                    set_output = self._gather(group.sources["set_output"])
+                    np.copyto(true_out, set_output, where=~np.isnan(set_output))
+                    out = np.where(_CONDITION[group.kind](in1, in2), true_out, group.false_out)
+                results.append(out)
+        for group, out in zip(self._groups, results):
+            self._values[group.rows] = out
+        self._tick += 1
+
+    def outputs(self) -> dict[str, np.ndarray]:
+        result: dict[str, np.ndarray] = {}
+        for name, rows in self._outputs.items():
+            value = np.full(self.batch_size, np.nan)
+            for row in rows:
+                candidate = self._values[row]
+                value = np.where(np.isnan(candidate), value, candidate)
+            result[name] = value
+        return result
+
+    def run(self, inputs: Mapping[str, ArrayLike] | ArrayLike, ticks: int | None = None) -> dict[str, np.ndarray]:
+        """Simulate from a clean state with constant inputs.
+
+        Args:
+            inputs: Input values, see `set_inputs`; scalars are broadcast.
+            ticks: Number of ticks; by default runs until the state stops changing
+                (at most the total delay of all components plus one).
+
+        Returns:
+            Values of the top-level outputs.
+        """
+        columns = self._columns(inputs)
+        batch_size = max([np.size(v) for v in columns.values()] + [1])
+        self.reset(batch_size)
+        self.set_inputs(columns)
+        if ticks is not None:
+            for _ in range(ticks):
+                self.step()
+            return self.outputs()
+        for _ in range(self._max_ticks):
+            previous = self._values.copy()
+            self.step()
+            if np.array_equal(previous, self._values, equal_nan=True):
+                break
+        return self.outputs()
@@ -1,11 +1,21 @@
-import gzip
+import json
+import os
+import zlib
+from collections import deque
+from contextvars import copy_context
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
 from functools import cached_property
-from ..core import Module, Tag
+from ..core import Module, Tag, IdAllocator, renumber
+from ..core.profiling import phase
+from .loader import merge_submarine, max_item_id
 
-__all__ = ["SubmarineBuilder", "GAME_VERSION"]
+__all__ = ["SubmarineBuilder", "SaveProfile", "PROFILES", "save_many", "GAME_VERSION"]
 
 GAME_VERSION: str = "1.8.8.1"
+MANIFEST_VERSION: int = 1
 
 # <class="Undefined">
 class SubmarineMainTag(Tag):
@@ -51,10 +61,67 @@ class ContentPackageTag(Tag):
         kwargs.pop("__class__")
         super().__init__("contentpackage", **kwargs)
 
+@dataclass(frozen=True)
+class SaveProfile:
+    """Serialization and compression settings of the .sub file.
+
+    Args:
+        pretty: Tab-indented XML, or no whitespace between tags at all.
+        compresslevel: zlib level, from 0 (none) to 9 (smallest output).
+        strategy: zlib strategy, e.g. `zlib.Z_FILTERED` or `zlib.Z_HUFFMAN_ONLY`.
+        memlevel: zlib memory level, from 1 to 9 (fastest, a bit smaller output).
+    """
+    pretty: bool = True
+    compresslevel: int = 9
+    strategy: int = zlib.Z_DEFAULT_STRATEGY
+    memlevel: int = 8
+
+    def compress(self, data: bytes) -> bytes:
+        """gzip-compressed `data`."""
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS,
+                                      self.memlevel, self.strategy)
+        return compressor.compress(data) + compressor.flush()
+
+PROFILES: dict[str, SaveProfile] = {
+    "default": SaveProfile(),
+    "fast": SaveProfile(pretty=False, compresslevel=1),
+    "compact": SaveProfile(pretty=False, compresslevel=6),
+    "release": SaveProfile(pretty=False, compresslevel=9, memlevel=9)
+}
+
+class _Fragment(Tag):
+    """Already serialized tags, indented like regular children."""
+    def __init__(self, text: str) -> None:
+        super().__init__("")
+        self._text: str = text
+
+    def _write(self, parts: list[str], indent: str | None) -> None:
+        parts.append(self._text if indent is None else self._text.replace("\n", f"\n{indent}"))
+
 class SubmarineBuilder:
-    def __init__(self, name: str, modules: list[Module]) -> None:
+    def __init__(self, name: str, modules: list[Module], ids: IdAllocator | None = None,
+                 base: Tag | None = None) -> None:
+        """
+        Args:
+            name: Submarine name.
+            modules: Top-level modules placed in the submarine.
+            ids: If set, all items get consecutive IDs from this allocator.
+            base: Submarine loaded with `load_submarine`, the generated items are added to it.
+                They are renumbered after its items, from `max_item_id(base) + 1` unless `ids`
+                is given, which must not go below that.
+        """
         self._name = name
         self._modules = tuple(modules)
+        self._base = base
+        if base is not None:
+            first = max_item_id(base) + 1
+            if ids is None:
+                ids = IdAllocator(first)
+            elif ids.start + ids.used < first:
+                raise ValueError(f"IDs from {ids.start + ids.used} collide with the base submarine, "
+                                 f"its items use IDs up to {first - 1}.")
+        if ids is not None:
+            renumber(self._modules, ids)
 
     @cached_property
     def tags(self) -> list[Tag]:
@@ -63,16 +130,158 @@ class SubmarineBuilder:
             tags.extend(module.compile())
         return tags
 
-    def save(self, save_dir: Path | str) -> None:
-        if isinstance(save_dir, str):
-            save_dir = Path(save_dir)
-        save_dir = save_dir / self._name
-        save_dir.mkdir(parents=True, exist_ok=True)
+    def digest(self) -> tuple[str, list[str]]:
+        """Hash of everything written by `save` and hashes of the separate modules."""
+        digests = [module.digest() for module in self._modules]
+        total = sha256(f"{MANIFEST_VERSION}\n{GAME_VERSION}\n{self._name}\n".encode())
+        for digest in digests:
+            total.update(digest.encode())
+        if self._base is not None:
+            total.update(repr(self._base.attributes).encode())
+            for child in self._base.childs:
+                total.update(str(child).encode())
+        return total.hexdigest(), digests
+
+    def _fragments(self, cache_dir: Path, digests: list[str], pretty: bool, force: bool) -> list[Tag]:
+        """Serialized tags of every module, compiled only if there is no cached copy."""
+        suffix = ".xml" if pretty else ".min.xml"
+        fragments: list[Tag] = []
+        for module, digest in zip(self._modules, digests):
+            path = cache_dir / f"{digest}{suffix}"
+            if path.exists() and not force:
+                text = path.read_text()
+            else:
+                separator = "\n" if pretty else ""
+                tags = module.compile()
+                with phase("serialize", module.__class__.__name__):
+                    text = separator.join([tag.render(pretty) for tag in tags])
+                path.write_text(text)
+            if len(text) > 0:
+                fragments.append(_Fragment(text))
+        used = {f"{digest}{s}" for digest in digests for s in (".xml", ".min.xml")}
+        for path in cache_dir.glob("*.xml"):
+            if path.name not in used:
+                path.unlink()
+        return fragments
+
+    def _prepare(self, save_dir: Path | str, profile: SaveProfile, force: bool) -> '_SaveJob | None':
+        """Paths and digests of a save, None if the previous output is up to date."""
+        save_dir = Path(save_dir)
+        cache_dir = save_dir / f".{self._name}.build"
+        with phase("digest", self.__class__.__name__):
+            total, digests = self.digest()
+        total = sha256(f"{total}\n{profile!r}".encode()).hexdigest()
+        job = _SaveJob(save_dir / self._name, cache_dir, total, digests, profile)
+        outputs = [job.save_dir / "filelist.xml", job.save_dir / f"{self._name}.sub"]
+        if (not force and job.manifest_path.exists() and all(p.exists() for p in outputs)
+            and json.loads(job.manifest_path.read_text()).get("digest") == total):
+            return None
+        return job
+
+    def _render(self, job: '_SaveJob', force: bool) -> tuple[str, str]:
+        """Text of filelist.xml and of the .sub file."""
+        job.cache_dir.mkdir(parents=True, exist_ok=True)
+        fragments = self._fragments(job.cache_dir, job.digests, job.profile.pretty, force)
         meta_tag = ContentPackageTag(self._name)(SubmarineAdditionalTag(self._name))
-        data_tag = SubmarineMainTag(self._name)(*self.tags)
-        with (save_dir / "filelist.xml").open("w") as file:
-            file.write(str(meta_tag))
-        sub_path = save_dir / self._name
-        with gzip.open(sub_path, "wt") as file:
-            file.write(str(data_tag))
-            sub_path.rename(save_dir / f"{self._name}.sub")
\ No newline at end of file
+        if self._base is None:
+            data_tag = SubmarineMainTag(self._name)(*fragments)
+        else:
+            data_tag = merge_submarine(self._base, *fragments)
+        with phase("serialize", self.__class__.__name__):
+            return str(meta_tag), data_tag.render(job.profile.pretty)
+
+    def _write(self, job: '_SaveJob', meta: str, data: str) -> None:
+        """Compress and write the rendered files, zlib releases the GIL here."""
+        job.save_dir.mkdir(parents=True, exist_ok=True)
+        with (job.save_dir / "filelist.xml").open("w") as file:
+            file.write(meta)
+        sub_path = job.save_dir / self._name
+        with phase("gzip", self.__class__.__name__):
+            compressed = job.profile.compress(data.encode())
+        with phase("write", self.__class__.__name__):
+            sub_path.write_bytes(compressed)
+        sub_path.rename(job.save_dir / f"{self._name}.sub")
+        manifest = {"version": MANIFEST_VERSION, "digest": job.digest, "modules": job.digests}
+        job.manifest_path.write_text(json.dumps(manifest, indent=4))
+
+    def save(self, save_dir: Path | str, force: bool = False,
+             profile: SaveProfile | str = "default") -> bool:
+        """Write the content package of the submarine into `save_dir/<name>`.
+
+        A manifest and the serialized tags of each module are kept in
+        `save_dir/.<name>.build`. Nothing is compiled or written if the
+        modules did not change since the last save, and only the changed
+        modules are recompiled otherwise. Changes in module classes' code
+        are not detected, use `force` after them.
+
+        Args:
+            save_dir: Directory of the content package.
+            force: Ignore cached builds.
+            profile: `SaveProfile` or name of one of `PROFILES`.
+
+        Returns:
+            False if the previous output was up to date.
+        """
+        job = self._prepare(save_dir, _profile(profile), force)
+        if job is None:
+            return False
+        self._write(job, *self._render(job, force))
+        return True
+
+def _profile(profile: SaveProfile | str) -> SaveProfile:
+    if isinstance(profile, SaveProfile):
+        return profile
+    if profile not in PROFILES:
+        raise KeyError(f"Unknown save profile '{profile}' (expected one of {list(PROFILES)}).")
+    return PROFILES[profile]
+
+@dataclass(frozen=True)
+class _SaveJob:
+    save_dir: Path
+    cache_dir: Path
+    digest: str
+    digests: list[str]
+    profile: SaveProfile
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / "manifest.json"
+
+def save_many(builders: list[SubmarineBuilder], save_dir: Path | str, force: bool = False,
+              profile: SaveProfile | str = "default", workers: int | None = None) -> list[bool]:
+    """Save several submarines, compressing finished ones while the next are compiled.
+
+    Compilation and serialization run in the calling thread, gzip compression and
+    writing run in a thread pool. At most two rendered submarines per worker wait
+    for compression at a time. Compilation and serialization hold the GIL and take
+    most of a save, so expect a small speedup over sequential saves. They are not
+    moved to worker processes: builders hold module registry handles and locally
+    defined classes, which cannot be pickled, and forking a threaded process is unsafe.
+
+    Args:
+        builders: Submarines to save.
+        save_dir: Directory passed to every `SubmarineBuilder.save`.
+        force: Ignore cached builds.
+        profile: `SaveProfile` or name of one of `PROFILES`.
+        workers: Compression threads, number of CPUs if None.
+
+    Returns:
+        Result of `SubmarineBuilder.save` for every builder.
+    """
+    workers = workers or os.cpu_count() or 1
+    profile = _profile(profile)
+    results: list[bool] = [False] * len(builders)
+    with ThreadPoolExecutor(workers) as pool:
+        pending: deque[Future] = deque()
+        for i, builder in enumerate(builders):
+            job = builder._prepare(save_dir, profile, force)
+            if job is None:
+                continue
+            rendered = builder._render(job, force)
+            while len(pending) >= 2 * workers:
+                pending.popleft().result()
+            pending.append(pool.submit(copy_context().run, builder._write, job, *rendered))
+            results[i] = True
+        for future in pending:
+            future.result()
+    return results
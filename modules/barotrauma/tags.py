@@ -1,13 +1,10 @@
-from functools import partial
 from typing import Any
 from .. import Tag
 
+# component tags of the catalog are generated on first access and are not star-exported
 __all__ = ["ItemTag", "RequiredItemTag", "HoldableTag", "ConnectionPanelTag",
            "WireTag", "InputTag", "OutputTag", "LinkTag",
-           "MemoryComponentTag", "ConditionComponentTag", "ArithmeticComponentTag",
-           "SignalCheckComponentTag", "GreaterComponentTag", "EqualsComponentTag", 
-           "AndComponentTag", "OrComponentTag", "XorComponentTag",
-           "AdderComponentTag", "SubstractComponentTag", "MultiplyComponentTag", "DivideComponentTag"]
+           "ComponentTag", "ConditionComponentTag", "ArithmeticComponentTag"]
 
 class ItemTag(Tag):
     """\\<Item> tag, defaults set to logical components."""
@@ -131,87 +128,40 @@ class OutputTag(Tag):
 #
 #################################################################################
 
-class MemoryComponentTag(Tag):
-    def __init__(self,
-                 MaxValueLength: int = 200,
-                 Value: Any = None,
-                 Writable: bool = True,
-                 PickingTime: int = 0,
-                 CanBePicked: bool = False,
-                 LockGuiFramePosition: bool = False,
-                 GuiFrameOffset: tuple[int, int] = (0, 0),
-                 AllowInGameEditing: bool = True,
-                 Msg: str = "") -> None:
-        kwargs: dict = locals().copy()
-        kwargs.pop("self")
-        kwargs.pop("__class__")
-        super().__init__("MemoryComponent", **kwargs)
-
-class ConditionComponentTag(Tag):
+_PANEL_DEFAULTS: dict[str, Any] = {
+    "PickingTime": 0,
+    "CanBePicked": False,
+    "LockGuiFramePosition": False,
+    "GuiFrameOffset": (0, 0),
+    "AllowInGameEditing": True,
+    "Msg": ""
+}
+
+class ComponentTag(Tag):
+    """Component element of a logical item, attributes not given keep `defaults`.
+
+    Concrete tags (`AdderComponentTag`, `MemoryComponentTag`, ...) are generated
+    from `catalog.TAGS` on first access.
+    """
+    tag_name: str | None = None
+    defaults: dict[str, Any] = _PANEL_DEFAULTS
+
+    def __init__(self, **kwds: dict[str, Any]) -> None:
+        unknown = [key for key in kwds if key not in self.defaults]
+        if len(unknown) > 0:
+            raise TypeError(f"{self.__class__.__name__} got unexpected attributes {unknown}.")
+        super().__init__(self.tag_name, **{**self.defaults, **kwds})
+
+class ConditionComponentTag(ComponentTag):
     """Some generalization - not real tag."""
-    _tagname: str | None = None
-    def __init__(self,
-                 MaxOutputLength: int = 200,
-                 Output: Any = 1,
-                 FalseOutput: Any = None,
-                 TimeFrame: int = 0,
-                 PickingTime: int = 0,
-                 CanBePicked: bool = False,
-                 LockGuiFramePosition: bool = False,
-                 GuiFrameOffset: tuple[int, int] = (0, 0),
-                 AllowInGameEditing: bool = True,
-                 Msg: str = "") -> None:
-        kwargs: dict = locals().copy()
-        kwargs.pop("self")
-        kwargs.pop("__class__")
-        super().__init__(self._tagname, **kwargs)
+    defaults = {"MaxOutputLength": 200, "Output": 1, "FalseOutput": None, "TimeFrame": 0, **_PANEL_DEFAULTS}
 
-class SignalCheckComponentTag(ConditionComponentTag):
-    _tagname: str = "SignalCheckComponent"
-
-class GreaterComponentTag(ConditionComponentTag):
-    _tagname: str = "GreaterComponent"
-
-class EqualsComponentTag(ConditionComponentTag):
-    _tagname: str = "EqualsComponent"
-
-class AndComponentTag(ConditionComponentTag):
-    _tagname: str = "AndComponent"
-
-class OrComponentTag(ConditionComponentTag):
-    _tagname: str = "OrComponent"
-
-class XorComponentTag(ConditionComponentTag):
-    _tagname: str = "XorComponent"
-
-class ArithmeticComponentTag(Tag):
+class ArithmeticComponentTag(ComponentTag):
     """Some generalization - not real tag."""
-    _tagname: str | None = None
-    def __init__(self,
-                 ClampMax: int = 999999,
-                 ClampMin: int = -999999,
-                 TimeFrame: int = 0,
-                 PickingTime: int = 0,
-                 CanBePicked: bool = False,
-                 LockGuiFramePosition: bool = False,
-                 GuiFrameOffset: tuple[int, int] = (0, 0),
-                 AllowInGameEditing: bool = True,
-                 Msg: str = "") -> None:
-        kwargs: dict = locals().copy()
-        kwargs.pop("self")
-        kwargs.pop("__class__")
-        super().__init__(self._tagname, **kwargs)
-
-class AdderComponentTag(ArithmeticComponentTag):
-    _tagname: str = "AdderComponent"
-
-class SubstractComponentTag(ArithmeticComponentTag):
-    _tagname: str = "SubstractComponent"
-
-class MultiplyComponentTag(ArithmeticComponentTag):
-    _tagname: str = "MultiplyComponent"
-
-class DivideComponentTag(ArithmeticComponentTag):
-    _tagname: str = "DivideComponent"
+    defaults = {"ClampMax": 999999, "ClampMin": -999999, "TimeFrame": 0, **_PANEL_DEFAULTS}
 
-# TODO: add another
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    from . import catalog
+    if name in catalog.TAGS:
+        return catalog.tag_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,114 @@
+from dataclasses import dataclass
+from .components import ComponentModule
+from .netlist import Netlist
+from .. import Module, IdAllocator
+
+__all__ = ["MAX_LINKS", "WireReport", "allocate_wires"]
+
+MAX_LINKS: int = 5    # wires a single connection of the connection panel accepts
+
+@dataclass(frozen=True)
+class WireReport:
+    """Result of `allocate_wires`, overflows are (component, connection, wires) triples.
+
+    Item counts include wires and the items components compile besides their own
+    (relays, lookup table entries).
+    """
+    nets: int
+    wires_before: int
+    wires_after: int
+    items_before: int
+    items_after: int
+    relays: int
+    overflows: tuple[tuple[ComponentModule, str, int], ...]
+
+    @property
+    def reduction(self) -> float:
+        """Share of the items removed."""
+        if self.items_before == 0:
+            return 0.0
+        return 1 - self.items_after / self.items_before
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(nets={self.nets}, wires={self.wires_before}->{self.wires_after}, "
+                f"items={self.items_before}->{self.items_after} ({0.0 - self.reduction:+.1%}), "
+                f"relays={self.relays}, overflows={len(self.overflows)})")
+
+def _count(components: tuple[ComponentModule, ...], wires: int) -> tuple[int, int]:
+    """Items and wires of the components, `wires` of them linked through `_connections`."""
+    items = len(components) + wires
+    for component in components:
+        internal_items, internal_wires = component._internal_items()
+        items += internal_items + internal_wires
+        wires += internal_wires
+    return items, wires
+
+def allocate_wires(module: Module, max_links: int = MAX_LINKS, ids: IdAllocator | None = None) -> WireReport:
+    """Keep only the wires every net physically needs, within `max_links` per connection.
+
+    A wire links exactly one output to one input, so a net needs one wire per
+    distinct input it drives. Repeated links between the same pair of connections
+    (e.g. one signal routed into a scheme through two inputs that end at the same
+    port) and wires with a free end are removed together with their items.
+    Connections left with more than `max_links` wires are split through trees of
+    relays, which forward signals within the same update. Internal connections
+    of components compiled to several items (`LookupTable`) over the limit are
+    reported.
+
+    Args:
+        module: Connected top-level module, changed in place.
+        max_links: Wire limit of a single connection, at least 2.
+        ids: Source of relay IDs, IDs after the largest one of the design if None.
+
+    Returns:
+        Wire and item counts before and after the pass.
+    """
+    if max_links < 2:
+        raise ValueError(f"Relay trees need at least 2 links per connection, got {max_links}.")
+    components = Netlist(module).components
+    drivers: dict[int, tuple[ComponentModule, str]] = {}
+    sinks: dict[int, tuple[ComponentModule, str]] = {}
+    owners: dict[int, tuple[ComponentModule, Module]] = {}
+    for component in components:
+        for name in component.output_names:
+            for wid in component._connections[name]:
+                drivers[wid] = (component, name)
+        for name in component.input_names:
+            for wid in component._connections[name]:
+                sinks[wid] = (component, name)
+        for child in component._submodules:
+            owners[child.id] = (component, child)
+    items_before, wires_before = _count(components, len(owners))
+    used: dict[tuple[int, str, int, str], int] = {}
+    dropped: set[int] = set()
+    for wid in sorted(set(drivers) | set(sinks)):
+        if wid not in drivers or wid not in sinks:
+            dropped.add(wid)
+            continue
+        (driver, out), (sink, port) = drivers[wid], sinks[wid]
+        key = (id(driver), out, id(sink), port)
+        if key in used:
+            dropped.add(wid)
+        else:
+            used[key] = wid
+    for component in components:
+        for wires in component._connections.values():
+            wires[:] = [wid for wid in wires if wid not in dropped]
+    for wid in dropped:
+        if wid in owners:
+            owner, wire = owners[wid]
+            owner._submodules.discard(wire)
+    if ids is None:
+        ids = IdAllocator(max([0, *owners, *[c._last_id() for c in components]]) + 1)
+    overflows: list[tuple[ComponentModule, str, int]] = []
+    for component in components:
+        component._split(max_links, ids)
+        overflows.extend([(component, name, links) for name, links in component._panel_links() if links > max_links])
+    items_after, wires_after = _count(components, len(owners) - len(dropped & set(owners)))
+    return WireReport(nets=len({(k[0], k[1]) for k in used}),
+                      wires_before=wires_before,
+                      wires_after=wires_after,
+                      items_before=items_before,
+                      items_after=items_after,
+                      relays=sum([len(c._relay_ids) // 2 for c in components]),
+                      overflows=tuple(overflows))
@@ -1,3 +1,6 @@
 from .tag import *
 from .signal import *
-from .module import *
\ No newline at end of file
+from .ids import *
+from .profiling import *
+from .module import *
+from .export import *
\ No newline at end of file
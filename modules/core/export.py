@@ -0,0 +1,131 @@
+import json
+from pathlib import Path
+from typing import Generator, TextIO
+from .signal import SignalIn, SignalOut
+from .module import Module, SchemeModule
+
+__all__ = ["export_graph"]
+
+def _children(module: Module) -> list[Module]:
+    """Submodules in order of their first connection, so names do not depend on set order."""
+    order: dict[int, Module] = {}
+    for pair in module._pairs():
+        for signal in pair:
+            handler = signal.handler
+            if handler is not module and id(handler) not in order:
+                order[id(handler)] = handler
+    for submodule in module._submodules:
+        order.setdefault(id(submodule), submodule)
+    return list(order.values())
+
+def _walk(module: Module, depth: int | None) -> Generator[tuple, None, None]:
+    """Depth-first events: ("enter", name, module, parent), ("leave", name),
+    ("node", name, module, parent) and ("edge", tail, head) with (node, port, expanded) ends."""
+    def expand(m: Module, level: int) -> bool:
+        return isinstance(m, SchemeModule) and (depth is None or level < depth)
+
+    stack: list[tuple] = [("visit", module, "m", 0, None)]
+    while stack:
+        item = stack.pop()
+        if item[0] == "leave":
+            yield item
+            continue
+        if item[0] == "edges":
+            _, scheme, name, names = item
+            for pair in scheme._pairs():
+                ends = []
+                for signal in pair:
+                    handler = signal.handler
+                    if handler is scheme:
+                        ends.append((name, signal.name, True, isinstance(signal, SignalIn)))
+                    else:
+                        child_name, expanded = names[id(handler)]
+                        ends.append((child_name, signal.name, expanded, isinstance(signal, SignalOut)))
+                head, tail = ends if ends[1][3] else ends[::-1]
+                yield ("edge", tail[:3], head[:3])
+            continue
+        _, current, name, level, parent = item
+        if not expand(current, level):
+            yield ("node", name, current, parent)
+            continue
+        yield ("enter", name, current, parent)
+        children = _children(current)
+        names = {id(c): (f"{name}_{i}", expand(c, level + 1)) for i, c in enumerate(children)}
+        stack.append(("leave", name))
+        stack.append(("edges", current, name, names))
+        for i, child in reversed(list(enumerate(children))):
+            stack.append(("visit", child, f"{name}_{i}", level + 1, name))
+
+def _escape(text: str) -> str:
+    for char in '\\"{}|<>':
+        text = text.replace(char, f"\\{char}")
+    return text
+
+def _write_dot(module: Module, file: TextIO, depth: int | None) -> None:
+    file.write(f'digraph "{_escape(str(module))}" {{\n')
+    file.write('\tgraph [rankdir=LR, overlap=false];\n\tnode [shape=record];\n')
+    indent = "\t"
+    for event in _walk(module, depth):
+        kind = event[0]
+        if kind == "enter":
+            _, name, scheme, _ = event
+            file.write(f'{indent}subgraph "cluster_{name}" {{\n')
+            indent += "\t"
+            file.write(f'{indent}label="{_escape(str(scheme))}";\n')
+            for port in scheme.input_names + scheme.output_names:
+                file.write(f'{indent}"{name}:{port}" [shape=plaintext, label="{_escape(port)}"];\n')
+        elif kind == "leave":
+            indent = indent[:-1]
+            file.write(f"{indent}}}\n")
+        elif kind == "node":
+            _, name, leaf, _ = event
+            inputs = " | ".join([f"<{p}> {_escape(p)}" for p in leaf.input_names])
+            outputs = " | ".join([f"<{p}> {_escape(p)}" for p in leaf.output_names])
+            file.write(f'{indent}"{name}" [label="{{{inputs}}} | {_escape(str(leaf))} | {{{outputs}}}"];\n')
+        else:
+            ends = [f'"{n}:{p}"' if expanded else f'"{n}":"{p}"' for n, p, expanded in event[1:]]
+            file.write(f"{indent}{ends[0]} -> {ends[1]};\n")
+    file.write("}\n")
+
+def _write_json(module: Module, file: TextIO, depth: int | None) -> None:
+    file.write('{"nodes": [')
+    separator = "\n"
+    for event in _walk(module, depth):
+        if event[0] not in ("enter", "node"):
+            continue
+        kind, name, current, parent = event
+        node = {"id": name, "label": str(current), "parent": parent,
+                "kind": "cluster" if kind == "enter" else "module",
+                "inputs": list(current.input_names), "outputs": list(current.output_names)}
+        file.write(separator + json.dumps(node))
+        separator = ",\n"
+    file.write('\n], "edges": [')
+    separator = "\n"
+    for event in _walk(module, depth):
+        if event[0] != "edge":
+            continue
+        (tail, tail_port, _), (head, head_port, _) = event[1:]
+        edge = {"tail": tail, "tail_port": tail_port, "head": head, "head_port": head_port}
+        file.write(separator + json.dumps(edge))
+        separator = ",\n"
+    file.write("\n]}\n")
+
+def export_graph(module: Module, path: Path | str, format: str = "dot", depth: int | None = None) -> None:
+    """Stream the connection graph of a module to a DOT or JSON file.
+
+    Expanded schemes become clusters, their own signals are drawn as plain nodes
+    inside the cluster. Node names follow the hierarchy (`m`, `m_0`, `m_0_3`, ...)
+    and the connection order, so they are stable between runs.
+
+    Args:
+        module: Connected module.
+        path: Output file.
+        format: "dot" or "json".
+        depth: Number of hierarchy levels to expand, deeper schemes are collapsed
+            into a single node. All levels by default.
+    """
+    writers = {"dot": _write_dot, "json": _write_json}
+    if format not in writers:
+        raise ValueError(f"Unknown graph format '{format}' (expected one of {list(writers)}).")
+    with Path(path).open("w") as file:
+        writers[format](module, file, depth)
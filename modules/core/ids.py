@@ -0,0 +1,79 @@
+from contextvars import ContextVar, Token
+from threading import Lock
+from typing import Self
+
+__all__ = ["IdAllocator"]
+
+class IdAllocator:
+    """Thread-safe source of dense integer IDs.
+
+    Used as a context manager it becomes the allocator of every module created
+    inside the block by the current thread (or asyncio task), so separate builds
+    get independent, reproducible IDs:
+
+        with IdAllocator():
+            module = MyScheme()     # IDs 1, 2, 3, ...
+    """
+    def __init__(self, start: int = 1, stop: int | None = None) -> None:
+        self._start: int = start
+        self._stop: int | None = stop
+        self._next: int = start
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def current() -> 'IdAllocator':
+        """Allocator of the innermost active scope, the process-wide one outside of scopes."""
+        return _active.get(_default)
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def stop(self) -> int | None:
+        return self._stop
+
+    @property
+    def used(self) -> int:
+        return self._next - self._start
+
+    def __next__(self) -> int:
+        with self._lock:
+            if self._stop is not None and self._next >= self._stop:
+                raise RuntimeError(f"ID range [{self._start}, {self._stop}) is exhausted.")
+            value = self._next
+            self._next += 1
+        return value
+
+    def __iter__(self) -> Self:
+        return self
+
+    def reserve(self, count: int) -> 'IdAllocator':
+        """Take the next `count` IDs as a separate allocator, e.g. for a worker."""
+        with self._lock:
+            if self._stop is not None and self._next + count > self._stop:
+                raise RuntimeError(f"Can not reserve {count} IDs in range [{self._start}, {self._stop}).")
+            block = IdAllocator(self._next, self._next + count)
+            self._next += count
+        return block
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next = self._start
+
+    def __enter__(self) -> Self:
+        token = _active.set(self)
+        _tokens.set(_tokens.get() + (token,))
+        return self
+
+    def __exit__(self, *args) -> None:
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        _active.reset(tokens[-1])
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(start={self._start}, stop={self._stop}, next={self._next})"
+
+_default: IdAllocator = IdAllocator()
+_active: ContextVar[IdAllocator] = ContextVar("id_allocator")
+_tokens: ContextVar[tuple[Token, ...]] = ContextVar("id_allocator_tokens", default=tuple())
@@ -1,16 +1,25 @@
-from typing import Any, Callable, Type, override
+import re
+from array import array
+from hashlib import sha256
+from typing import TYPE_CHECKING, Any, Callable, Sequence, Type, override
 from functools import partialmethod, partial
-from itertools import count
 from uuid import uuid4
 from abc import ABC, abstractmethod
-from graphviz import Digraph
-from . import Tag, Signal, SignalIn, SignalOut
+from . import Tag, Signal, SignalIn, SignalOut, Bus, IdAllocator
+from .signal import _register, _signals, _handles
+from .profiling import timed
 
-__all__ = ["Module", "SchemeModule", "create_scheme"]
+if TYPE_CHECKING:
+    from graphviz import Digraph
+
+__all__ = ["Module", "SchemeModule", "create_scheme", "renumber"]
 
 class Module(ABC):
-    _ids: count = count(1)
     _int_id: bool = False
+    _input_names: tuple[str, ...] = tuple()
+    _output_names: tuple[str, ...] = tuple()
+    _port_names: tuple[str, ...] = tuple()     # inputs followed by outputs
+    _port_index: dict[str, int] = {}    # port name -> index in `_port_names`
 
     def __init_subclass__(cls) -> None:
         for key, value in cls.__base__.__dict__.items():
@@ -19,40 +28,54 @@ class Module(ABC):
             setattr(cls, key, value)
         if "__init__" in cls.__dict__:
             cls.__init__ = partialmethod(cls.__configure__, init=cls.__init__)
+        if "compile" in cls.__dict__:
+            cls.compile = timed("compile")(cls.compile)
         if "__configure__" in cls.__dict__:
             raise SyntaxError(f"Do not override `__configure__` method (in class {cls.__name__}).")
         if "__setattr__" in cls.__dict__:
             raise SyntaxError(f"Do not override `__setattr__` method (in class {cls.__name__}).")
         
-    def __configure__(self, *args: list[Any], init: Callable, **kwds: dict[str, Any]) -> None:
-        self._inputs: tuple[Signal] = tuple()
-        self._outputs: tuple[Signal] = tuple()
+    @classmethod
+    def _collect_ports(cls) -> None:
+        """Port names of the class, collected on the first instance (schemes may add ports after creation)."""
         inputs: list[str] = []
         outputs: list[str] = []
-        for key, value in self.__class__.__dict__.items():
+        for key, value in cls.__dict__.items():
+            if isinstance(value, Signal) and value.name is None:
+                value.__set_name__(cls, key)
             if isinstance(value, SignalIn):
-                inputs.append(SignalIn(key, self))
-                setattr(self, key, inputs[-1])
+                inputs.append(key)
             if isinstance(value, SignalOut):
-                outputs.append(SignalOut(key, self))
-                setattr(self, key, outputs[-1])
-        self._inputs = tuple(inputs)
-        self._outputs = tuple(outputs)
+                outputs.append(key)
+        cls._input_names = tuple(inputs)
+        cls._output_names = tuple(outputs)
+        cls._port_names = cls._input_names + cls._output_names
+        cls._port_index = {name: i for i, name in enumerate(cls._port_names)}
+
+    @timed("elaborate")
+    def __configure__(self, *args: list[Any], init: Callable, **kwds: dict[str, Any]) -> None:
+        cls = self.__class__
+        if "_port_index" not in cls.__dict__:
+            cls._collect_ports()
+        self._index: int = -1     # handle of the ports, modules without ports are not registered
+        if len(cls._port_index) > 0:
+            self._index = _register(self, cls._port_names, len(cls._input_names))
         self._id: int | str = str(uuid4())
         if self._int_id:
-            self._id = next(self._ids)
+            self._id = next(IdAllocator.current())
         self._submodules: set[Module] = set()
-        self._connect_signals: list[tuple[Signal, Signal]] = []
+        self._connect_signals: array | tuple = tuple()    # port handles of the connected pairs, see `_pairs`
+        self._init_args: tuple[tuple, dict[str, Any]] = (args, kwds)
         self.__pre_init__()
         self._initialized: bool = True
         init(self, *args, **kwds)
         def raise_error(*args: list[Any], error: str, **kwds: dict[str, Any]) -> None:
             raise SyntaxError(error)
         self.connect = partial(raise_error, self=self, error="Do not use `connect` outside __init__.")
+        self.connect_many = partial(raise_error, self=self, error="Do not use `connect_many` outside __init__.")
         
     def __setattr__(self, name: str, value: Any) -> None:
-        if (name not in ["_inputs", "_outputs"] 
-            and name in self.input_names + self.output_names):
+        if name in self._port_index:
             raise SyntaxError(f"Do not rewrite input/output value (instanse of the {self.__class__.__name__}).")
         return super().__setattr__(name, value)
     
@@ -72,32 +95,80 @@ class Module(ABC):
 
     @property
     def inputs(self) -> tuple[SignalIn]:
-        return self._inputs
+        return tuple([SignalIn._at(self._index, i) for i in range(len(self._input_names))])
     
     @property
     def n_inputs(self) -> int:
-        return len(self.inputs)
+        return len(self._input_names)
     
     @property
     def input_names(self) -> tuple[str]:
-        return tuple([s.name for s in self.inputs])
+        return self._input_names
     
     @property
     def outputs(self) -> tuple[SignalOut]:
-        return self._outputs
+        offset = len(self._input_names)
+        return tuple([SignalOut._at(self._index, offset + i) for i in range(len(self._output_names))])
     
     @property
     def n_outputs(self) -> int:
-        return len(self.outputs)
+        return len(self._output_names)
     
     @property
     def output_names(self) -> tuple[str]:
-        return tuple([s.name for s in self.outputs])
+        return self._output_names
     
     @property
     def id(self) -> int | str:
         return self._id
     
+    def _digest_state(self) -> list[str]:
+        """Module state affecting the compiled tags which is not given by arguments and connections."""
+        return []
+
+    def digest(self) -> str:
+        """Content hash of the module subtree.
+
+        Covers classes, constructor arguments, integer IDs, connections and
+        `_digest_state` of every module below, but not the code of the classes.
+        """
+        digests: dict[int, str] = {}
+        stack: list[tuple[Module, bool]] = [(self, False)]
+        while stack:
+            module, ready = stack.pop()
+            if id(module) in digests:
+                continue
+            if not ready:
+                stack.append((module, True))
+                stack.extend([(s, False) for s in module._submodules if id(s) not in digests])
+                continue
+            label = lambda m: "self" if m is module else digests[id(m)]
+            cls = module.__class__
+            parts = [f"{cls.__module__}.{cls.__qualname__}", repr(module._init_args),
+                     str(module.id) if module._int_id else "",
+                     *sorted([digests[id(s)] for s in module._submodules]),
+                     *[f"{label(a.handler)}:{a.name}>{label(b.handler)}:{b.name}"
+                       for a, b in module._pairs()],
+                     *module._digest_state()]
+            digests[id(module)] = sha256("\n".join(parts).encode()).hexdigest()
+        return digests[id(self)]
+
+    def _remap_ids(self, mapping: dict[int, int]) -> None:
+        """Update stored references to other modules' IDs after renumbering."""
+        pass
+
+    def _reserve_ids(self, ids: IdAllocator) -> None:
+        """Take the IDs the module needs besides its own, right after it got its ID.
+
+        Called by `renumber`; modules using it call it from `__init__` as well.
+        """
+        pass
+
+    def _pairs(self) -> list[tuple[Signal, Signal]]:
+        """Connected signals as (receiving side, sending side), in order of connection."""
+        signals = _signals(self._connect_signals)
+        return list(zip(signals[::2], signals[1::2]))
+
     @abstractmethod
     def _connect_in(self, called_from: 'Module', signal: Signal) -> None:
         pass
@@ -107,27 +178,63 @@ class Module(ABC):
                      *args: list[Any], **kwds: dict[str, Any]) -> None:
         pass
     
-    def connect(self, signal1: Signal, signal2: Signal) -> None:
-        if not hasattr(self, "_initialized") or not self._initialized:
-            raise RuntimeError("`connect` is not allowed before initialization.")
+    def _orient(self, signal1: Signal, signal2: Signal) -> tuple[Signal, Signal]:
+        """Order a pair as (receiving side, sending side) for `_connect_in`/`_connect_out`."""
         signals: tuple[Signal] = (signal1, signal2)
         if isinstance(signal1, SignalOut):
             signals = (signal2, signal1)
-        if signals[1].handler == self:
+        if signals[1]._module == self._index:
             signals = signals[::-1]
-        if signal1.handler != self:
+        return signals
+
+    @timed("connect")
+    def connect(self, signal1: Signal, signal2: Signal) -> None:
+        if not hasattr(self, "_initialized") or not self._initialized:
+            raise RuntimeError("`connect` is not allowed before initialization.")
+        signals = self._orient(signal1, signal2)
+        if signal1._module != self._index:
             self._submodules.add(signal1.handler)
-        if signal2.handler != self:
+        if signal2._module != self._index:
             self._submodules.add(signal2.handler)
-        self._connect_signals.append(signals)
+        self._connect_signals = self._connect_signals or _handles()
+        self._connect_signals.extend(_handles(signals))
         self._connect_out(self, signals[1], self._connect_in(self, signals[0]))
 
+    @timed("connect")
+    def connect_many(self, signals1: Sequence[Signal], signals2: Sequence[Signal]) -> None:
+        """Connect two buses lane by lane, same as `connect` on every pair."""
+        if not hasattr(self, "_initialized") or not self._initialized:
+            raise RuntimeError("`connect_many` is not allowed before initialization.")
+        if len(signals1) != len(signals2):
+            raise ValueError(f"Connection of buses with different widths ({len(signals1)} and {len(signals2)}).")
+        pairs = [self._orient(s1, s2) for s1, s2 in zip(signals1, signals2)]
+        signals = {s._module: s for pair in pairs for s in pair}    # one signal per module handle
+        signals.pop(self._index, None)
+        self._submodules.update([s.handler for s in signals.values()])
+        self._connect_signals = self._connect_signals or _handles()
+        self._connect_signals.extend(_handles([s for pair in pairs for s in pair]))
+        for signal_in, signal_out in pairs:
+            self._connect_out(self, signal_out, self._connect_in(self, signal_in))
+
+    def bus(self, prefix: str) -> Bus:
+        """Numbered signals `<prefix>1`, `<prefix>2`, ... of the module as a bus."""
+        pattern = re.compile(rf"{re.escape(prefix)}(\d+)")
+        lanes: list[tuple[int, Signal]] = []
+        for signal in self.inputs + self.outputs:
+            match = pattern.fullmatch(signal.name)
+            if match:
+                lanes.append((int(match[1]), signal))
+        if len(lanes) == 0:
+            raise KeyError(f"{self.__class__.__name__} has no signals '{prefix}<N>'.")
+        return Bus(s for _, s in sorted(lanes, key=lambda lane: lane[0]))
+
     @abstractmethod
     def compile(self) -> list[Tag]:
         pass
 
-    def visualization(self) -> Digraph:
+    def visualization(self) -> 'Digraph':
         # FIXME: visualiztion looks ugly, some changes required
+        from graphviz import Digraph    # imported here, loading it takes longer than the whole package
         graph = Digraph(graph_attr={"overlap": "false"})
         graph.attr("node", shape="record")
         nodes: dict[Module, str] = {}
@@ -137,7 +244,7 @@ class Module(ABC):
             outputs = [f"<{name}> {name}" for name in module.output_names]
             nodes[module] = name
             graph.node(name, f"{{{" | ".join(inputs)}}} | {str(module)} | {{{" | ".join(outputs)}}}")
-        for signal1, signal2 in self._connect_signals:
+        for signal1, signal2 in self._pairs():
             if signal1.handler != self and signal2.handler != self:
                 node_head = nodes[signal2.handler]
                 head_port = signal2.name
@@ -153,17 +260,36 @@ class Module(ABC):
         
 class SchemeModule(Module):
     def __pre_init__(self) -> None:
-        self._lookup_table: dict[str, list[Signal]] = {}
-        for name in self.input_names + self.output_names:
-            self._lookup_table[name] = []
+        self._lookup_table: dict[str, array] = {}    # port handles connected to every signal
+        self._flat_table: dict[str, array] = {}
+
+    def _lookup(self, name: str) -> list[Signal]:
+        """Signals of submodules connected to a signal of the module."""
+        if name not in self._port_index:
+            raise KeyError(f"{self.__class__.__name__} has no signal '{name}'.")
+        return _signals(self._lookup_table.get(name, tuple()))
+
+    def _flatten(self, name: str) -> list[Signal]:
+        """Non-scheme signals behind a signal of the module (used once `__init__` is finished)."""
+        if name not in self._flat_table:
+            flat = _handles()
+            for s in self._lookup(name):
+                handler = s.handler
+                if isinstance(handler, SchemeModule):
+                    handler._flatten(s.name)
+                    flat.extend(handler._flat_table[s.name])
+                else:
+                    flat.extend((s._module, s._port))
+            self._flat_table[name] = flat
+        return _signals(self._flat_table[name])
 
     @override
     def _connect_in(self, called_from: Module, signal: Signal) -> Signal | list:
-        if signal.handler == self:
+        if signal._module == self._index:
             if called_from == self:
                 return signal
             arg_list: list = []
-            for s in self._lookup_table[signal.name]:
+            for s in self._flatten(signal.name):
                 arg_list.extend(s.handler._connect_in(called_from, s))
             return arg_list
         return signal.handler._connect_in(called_from, signal)
@@ -171,12 +297,14 @@ class SchemeModule(Module):
     @override
     def _connect_out(self, called_from: Module, signal: Signal, connect_in: Signal | list) -> None:
         if isinstance(connect_in, Signal):
-            if signal.handler == connect_in.handler:
+            if signal._module == connect_in._module:
                 raise ValueError(f"Connection of the inputs/outputs signals from one module is disallowed (attempt to connect '{signal.name}' and '{connect_in.name}').")
-            self._lookup_table[connect_in.name].append(signal)
+            if connect_in.name not in self._lookup_table:
+                self._lookup_table[connect_in.name] = _handles()
+            self._lookup_table[connect_in.name].extend((signal._module, signal._port))
             return
-        if signal.handler == self:
-            for s in self._lookup_table[signal.name]:
+        if signal._module == self._index:
+            for s in self._flatten(signal.name):
                 s.handler._connect_out(called_from, s, connect_in)
             return
         return signal.handler._connect_out(called_from, signal, connect_in)
@@ -219,19 +347,69 @@ def create_scheme(n_inputs: int, n_outputs: int,
     @add_inputs_outputs
     class CustomSchemeModule(SchemeModule):
         def __init__(self) -> None:
+            signals1: list[Signal] = []
+            signals2: list[Signal] = []
+            inputs = [m.inputs for m in submodules]     # views are created on every access
+            outputs = [m.outputs for m in submodules]
             for node1, node2 in connections:
                 mod1_idx, signal_out = node1
                 mod2_idx, signal_in = node2
-                module1 = submodules[mod1_idx]
-                module2 = submodules[mod2_idx]
-                self.connect(module1.outputs[signal_out], module2.inputs[signal_in])
+                signals1.append(outputs[mod1_idx][signal_out])
+                signals2.append(inputs[mod2_idx][signal_in])
+            own_inputs = self.inputs
             for i, nodes in enumerate(self_in_connection):
                 for mod_idx, signal_in in nodes:
-                    module = submodules[mod_idx]
-                    self.connect(self.inputs[i], module.inputs[signal_in])
+                    signals1.append(own_inputs[i])
+                    signals2.append(inputs[mod_idx][signal_in])
+            own_outputs = self.outputs
             for i, nodes in enumerate(self_out_connection):
                 for mod_idx, signal_out in nodes:
-                    module = submodules[mod_idx]
-                    self.connect(self.outputs[i], module.outputs[signal_out])
+                    signals1.append(own_outputs[i])
+                    signals2.append(outputs[mod_idx][signal_out])
+            self.connect_many(signals1, signals2)
 
     return CustomSchemeModule
+
+def renumber(modules: list[Module], ids: IdAllocator) -> dict[int, int]:
+    """Give all integer-ID modules under `modules` consecutive IDs from `ids`.
+
+    Every entry of `modules` with its subtree is a design, designs are numbered
+    one after another and keep their creation order. IDs stored by the modules
+    (e.g. wire links) are remapped within their own design, so designs built in
+    separate `IdAllocator` scopes may reuse the same IDs. Returns mapping from
+    `id()` of the renumbered modules to their new IDs.
+
+    Raises:
+        ValueError: If two modules of one design have the same ID.
+    """
+    visited: set[int] = set()
+    designs: list[list[Module]] = []
+    for top in modules:
+        design: list[Module] = []
+        stack: list[Module] = [top]
+        while stack:
+            module = stack.pop()
+            if id(module) in visited:
+                continue
+            visited.add(id(module))
+            design.append(module)
+            stack.extend(module._submodules)
+        designs.append(design)
+    numbered: list[list[Module]] = []
+    for top, design in zip(modules, designs):
+        numbered.append(sorted([m for m in design if m._int_id], key=lambda m: m.id))
+        old_ids = [m.id for m in numbered[-1]]
+        if len(set(old_ids)) != len(old_ids):
+            raise ValueError(f"Modules of one design ({top!r}) share IDs, build it in one `IdAllocator` scope.")
+    renumbered: dict[int, int] = {}
+    for design, design_numbered in zip(designs, numbered):
+        mapping: dict[int, int] = {}
+        for module in design_numbered:
+            mapping[module.id] = next(ids)
+            module._id = mapping[module.id]
+            renumbered[id(module)] = module._id
+            module._reserve_ids(ids)
+        for module in design:
+            module._submodules = set(list(module._submodules))    # hashes depend on IDs, a set copy keeps the old ones
+            module._remap_ids(mapping)
+    return renumbered
@@ -0,0 +1,231 @@
+import json
+import time
+import tracemalloc
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, asdict
+from functools import wraps
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Callable, ContextManager, Self
+
+__all__ = ["PhaseStats", "BuildReport", "BuildProfiler"]
+
+@dataclass(frozen=True)
+class PhaseStats:
+    """Measurements of one phase, or of one class within a phase.
+
+    `seconds` counts only the outermost of nested calls, `self_seconds`
+    excludes the time spent in other measured calls. `peak_memory` is the
+    largest growth of traced memory during a single call in bytes, None
+    if memory was not traced.
+    """
+    calls: int
+    seconds: float
+    self_seconds: float
+    peak_memory: int | None
+
+@dataclass(frozen=True)
+class BuildReport:
+    """Result of a `BuildProfiler` run.
+
+    `classes` maps phase -> class name -> stats, `peak_memory` is the largest
+    growth of traced memory over the whole block.
+    """
+    seconds: float
+    peak_memory: int | None
+    phases: dict[str, PhaseStats]
+    classes: dict[str, dict[str, PhaseStats]]
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def write_json(self, path: Path | str) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=4))
+
+    def __str__(self) -> str:
+        memory = lambda value: "-" if value is None else f"{value / 2 ** 20:.1f}"
+        lines = [f"{'phase':<12} {'class':<24} {'calls':>8} {'total, s':>9} {'self, s':>9} {'peak, MiB':>10}"]
+        for name, stats in self.phases.items():
+            lines.append(f"{name:<12} {'':<24} {stats.calls:>8} {stats.seconds:>9.3f} "
+                         f"{stats.self_seconds:>9.3f} {memory(stats.peak_memory):>10}")
+            ranked = sorted(self.classes[name].items(), key=lambda item: -item[1].self_seconds)
+            for cls, stats in ranked:
+                lines.append(f"{'':<12} {cls:<24} {stats.calls:>8} {stats.seconds:>9.3f} "
+                             f"{stats.self_seconds:>9.3f} {memory(stats.peak_memory):>10}")
+        lines.append(f"{'total':<12} {'':<24} {'':>8} {self.seconds:>9.3f} {'':>9} {memory(self.peak_memory):>10}")
+        return "\n".join(lines)
+
+class _Frame:
+    __slots__ = ("phase", "key", "start", "children", "base", "peak")
+
+    def __init__(self, phase: str, key: str, base: int) -> None:
+        self.phase = phase
+        self.key = key
+        self.start = time.perf_counter()
+        self.children: float = 0.0
+        self.base = base
+        self.peak = base
+
+class _Phase:
+    """Context manager measuring one call."""
+    __slots__ = ("_profiler", "_phase", "_key")
+
+    def __init__(self, profiler: 'BuildProfiler', phase: str, key: str) -> None:
+        self._profiler = profiler
+        self._phase = phase
+        self._key = key
+
+    def __enter__(self) -> None:
+        self._profiler._enter(self._phase, self._key)
+
+    def __exit__(self, *args) -> None:
+        self._profiler._exit()
+
+class BuildProfiler:
+    """Opt-in timing and memory instrumentation of module builds.
+
+    Inside the block, module elaboration (`__init__` and `connect`), `compile`
+    and the serialization, compression and writing done by `SubmarineBuilder.save`
+    are measured per phase and per module class:
+
+        with BuildProfiler(memory=True) as profiler:
+            builder = SubmarineBuilder("sub", [MyScheme()])
+            builder.save("out")
+        print(profiler.report)
+
+    Measurements made in other threads are included if they run in a copy of
+    the block's context. Traced memory is process-wide, so peaks of calls
+    running in parallel overlap.
+
+    Args:
+        memory: Trace memory allocations with `tracemalloc` (several times slower).
+        path: If set, the report is written there as JSON when the block ends.
+    """
+    def __init__(self, memory: bool = False, path: Path | str | None = None) -> None:
+        self._memory = memory
+        self._path = path
+        self._lock = Lock()
+        self._local = local()
+        # (phase, key) -> [calls, seconds, self seconds, peak memory]
+        self._records: dict[tuple[str, str], list] = {}
+        self._phases: dict[str, list] = {}
+        self._start: float | None = None
+        self._base: int = 0
+        self._peak: int = 0
+        self._started_tracing: bool = False
+        self._token: Token | None = None
+        self._report: BuildReport | None = None
+
+    @staticmethod
+    def current() -> 'BuildProfiler | None':
+        """Profiler of the innermost active block, None outside of blocks."""
+        return _active.get()
+
+    @property
+    def report(self) -> BuildReport:
+        if self._report is None:
+            raise RuntimeError("The report is available after the profiled block ends.")
+        return self._report
+
+    def _stack(self) -> list[_Frame]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _traced(self) -> tuple[int, int]:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._peak = max(self._peak, peak)
+        return current, peak
+
+    def _enter(self, phase: str, key: str) -> None:
+        stack = self._stack()
+        base = 0
+        if self._memory:
+            base, peak = self._traced()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+        stack.append(_Frame(phase, key, base))
+
+    def _exit(self) -> None:
+        end = time.perf_counter()
+        stack = self._stack()
+        frame = stack.pop()
+        elapsed = end - frame.start
+        peak = None
+        if self._memory:
+            frame.peak = max(frame.peak, self._traced()[1])
+            peak = frame.peak - frame.base
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+        if stack:
+            stack[-1].children += elapsed
+        outer_key = all((f.phase, f.key) != (frame.phase, frame.key) for f in stack)
+        outer_phase = all(f.phase != frame.phase for f in stack)
+        with self._lock:
+            for records, key, outer in ((self._records, (frame.phase, frame.key), outer_key),
+                                        (self._phases, frame.phase, outer_phase)):
+                record = records.setdefault(key, [0, 0.0, 0.0, None])
+                record[0] += 1
+                record[1] += elapsed if outer else 0.0
+                record[2] += elapsed - frame.children
+                if peak is not None:
+                    record[3] = max(record[3] or 0, peak)
+
+    def phase(self, phase: str, key: str) -> _Phase:
+        return _Phase(self, phase, key)
+
+    def __enter__(self) -> Self:
+        self._records.clear()
+        self._phases.clear()
+        self._report = None
+        if self._memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self._memory:
+            tracemalloc.reset_peak()
+            self._base = self._peak = tracemalloc.get_traced_memory()[0]
+        self._token = _active.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        seconds = time.perf_counter() - self._start
+        _active.reset(self._token)
+        peak = None
+        if self._memory:
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1]) - self._base
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        stats = lambda record: PhaseStats(record[0], record[1], record[2], record[3])
+        classes: dict[str, dict[str, PhaseStats]] = {name: {} for name in self._phases}
+        for (name, key), record in sorted(self._records.items()):
+            classes[name][key] = stats(record)
+        self._report = BuildReport(seconds, peak, {name: stats(r) for name, r in self._phases.items()}, classes)
+        if self._path is not None:
+            self._report.write_json(self._path)
+
+_active: ContextVar[BuildProfiler | None] = ContextVar("build_profiler", default=None)
+_NULL: ContextManager = nullcontext()
+
+def phase(name: str, key: str) -> ContextManager:
+    """Measure the block as a call of phase `name` by `key` (usually a class name) if profiling is active."""
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL
+    return profiler.phase(name, key)
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator measuring every call of a method as phase `name` of the instance's class."""
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self, *args, **kwds):
+            profiler = _active.get()
+            if profiler is None:
+                return method(self, *args, **kwds)
+            with profiler.phase(name, self.__class__.__name__):
+                return method(self, *args, **kwds)
+        return wrapper
+    return decorator
@@ -1,27 +1,139 @@
-from dataclasses import dataclass
+from array import array
+from threading import Lock
+from typing import Any, Sequence, Self
 from weakref import ref
 
-__all__ = ["Signal", "SignalIn", "SignalOut"]
+__all__ = ["Signal", "SignalIn", "SignalOut", "Bus"]
+
+# Live modules with ports are registered here; a port is the (module index, port index)
+# handle into these arrays, inputs are numbered before outputs. Slots of collected modules
+# are reused, the arrays only grow to the largest number of modules alive at once. Stored
+# handles always belong to live modules (schemes keep their submodules), signal views
+# carry the slot generation to detect that their module is gone.
+_modules: list['_ModuleRef | None'] = []
+_ports: list[tuple[str, ...]] = []      # port names of the module's class, the class tuple is shared
+_n_inputs: list[int] = []
+_generations: list[int] = []
+_free: list[int] = []
+_lock: Lock = Lock()
+
+class _ModuleRef(ref):
+    __slots__ = ("index",)
+
+def _release(module: _ModuleRef) -> None:
+    # may run from the garbage collector at any point, so only atomic list operations
+    _modules[module.index] = None
+    _free.append(module.index)
+
+def _register(module: 'Module', ports: tuple[str, ...], n_inputs: int) -> int:
+    """Handle index of a new module, `ports` are the names of its inputs followed by outputs."""
+    module_ref = _ModuleRef(module, _release)
+    with _lock:
+        if _free:
+            index = _free.pop()
+            _modules[index] = module_ref
+            _ports[index] = ports
+            _n_inputs[index] = n_inputs
+            _generations[index] += 1
+        else:
+            index = len(_modules)
+            _modules.append(module_ref)
+            _ports.append(ports)
+            _n_inputs.append(n_inputs)
+            _generations.append(0)
+    module_ref.index = index
+    return index
+
+def _signal(module: int, port: int) -> 'Signal':
+    """View of a port handle."""
+    return (SignalIn if port < _n_inputs[module] else SignalOut)._at(module, port)
+
+def _signals(handles: Sequence[int]) -> list['Signal']:
+    """Views of handles stored flat, as (module, port, module, port, ...)."""
+    return [_signal(handles[i], handles[i + 1]) for i in range(0, len(handles), 2)]
+
+def _handles(signals: Sequence['Signal'] = tuple()) -> array:
+    """Flat handle array of signals, see `_signals`."""
+    handles = array("q")
+    for signal in signals:
+        handles.append(signal._module)
+        handles.append(signal._port)
+    return handles
 
-@dataclass(frozen=True)
 class Signal:
-    name: str = None
-    _handler: 'Module' = None
+    """Port of a module.
+
+    Declared on a module class (`a = SignalIn()`), the signal is a template:
+    instances of the class return views of their own ports. A view stores only
+    the (module index, port index) handle, name and module are looked up in the
+    registry arrays. Views of the same port are equal. A view outliving its
+    module has neither name nor handler.
+    """
+    __slots__ = ("_module", "_port", "_generation")
+
+    def __init__(self, name: str | None = None, handler: 'Module' = None) -> None:
+        if handler is None:
+            self._module: int = -1
+            self._port: Any = name     # declaration: the name, set by the owning class
+            self._generation: int = 0
+        else:
+            self._module = handler._index
+            self._port = handler._port_index[name]
+            self._generation = _generations[self._module]
+
+    @classmethod
+    def _at(cls, module: int, port: int) -> Self:
+        signal = object.__new__(cls)
+        signal._module = module
+        signal._port = port
+        signal._generation = _generations[module]
+        return signal
 
-    def __post_init__(self) -> None:
-        if self._handler is not None:
-            object.__setattr__(self, "_handler", ref(self._handler))    # hack to change frozen :)
+    def __set_name__(self, owner: type, name: str) -> None:
+        if self._port is None:
+            self._port = name
+
+    def __get__(self, instance: 'Module | None', owner: type) -> Self:
+        if instance is None:
+            return self
+        return self._at(instance._index, owner._port_index[self._port])
+
+    def _live(self) -> bool:
+        if self._module < 0 or _generations[self._module] != self._generation:
+            return False
+        module_ref = _modules[self._module]
+        return module_ref is not None and module_ref() is not None
+
+    @property
+    def name(self) -> str | None:
+        if self._module < 0:
+            return self._port
+        return _ports[self._module][self._port] if self._live() else None
 
     @property
     def handler(self) -> 'Module':
-        if self._handler is None:
-            return None
-        return self._handler()
+        return _modules[self._module]() if self._live() else None
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self._module == other._module and self._port == other._port
+                and self._generation == other._generation)
+
+    def __hash__(self) -> int:
+        return hash((self.__class__, self._module, self._port, self._generation))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name!r}, handler={self.handler!r})"
 
-@dataclass(frozen=True)
 class SignalIn(Signal):
-    pass
+    __slots__ = ()
 
-@dataclass(frozen=True)
 class SignalOut(Signal):
-    pass
\ No newline at end of file
+    __slots__ = ()
+
+class Bus(tuple[Signal, ...]):
+    """Ordered group of signals, connected lane by lane with `Module.connect_many`."""
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple([s.name for s in self])
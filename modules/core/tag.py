@@ -50,16 +50,27 @@ class Tag:
         self.add_childs(*childs)
         return self
     
+    def _write(self, parts: list[str], indent: str | None) -> None:
+        """Append serialized tag to `parts`; `indent` prefixes its inner lines, None for compact output."""
+        attrs = "".join([f' {key}="{self.stringifier(value)}"' for key, value in self._attributes.items()])
+        if len(self._childs) == 0:
+            parts.append(f"<{self._name}{attrs} />")
+            return
+        parts.append(f"<{self._name}{attrs}>")
+        inner = None if indent is None else f"{indent}\t"
+        for child in self._childs:
+            if inner is not None:
+                parts.append(f"\n{inner}")
+            child._write(parts, inner)
+        if indent is not None:
+            parts.append(f"\n{indent}")
+        parts.append(f"</{self._name}>")
+
+    def render(self, pretty: bool = True) -> str:
+        """XML text of the tag, tab-indented or without any whitespace between tags."""
+        parts: list[str] = []
+        self._write(parts, "" if pretty else None)
+        return "".join(parts)
+
     def __repr__(self) -> str:
-        attrs: str = ""
-        for key, value in self.attributes:
-            attrs = f'{attrs} {key}="{self.stringifier(value)}"'
-        childs: str = ""
-        for child in self.childs:
-            if len(childs) == 0:
-                childs = "\n"
-            child_str = str(child).replace("\n", "\n\t")
-            childs = f"{childs}\t{child_str}\n"
-        term1: str = " /" if len(childs) == 0 else ""
-        term2: str = f"</{self.tagname}>" if len(term1) == 0 else ""
-        return f"<{self.tagname}{attrs}{term1}>{childs}{term2}"
+        return self.render()